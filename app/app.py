@@ -1,12 +1,14 @@
 import os
+import json
+import threading
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import pandas as pd
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.wsgi import WSGIMiddleware
 from dash import Dash, html, dcc, Input, Output
-from flask import Flask
-from pymongo import MongoClient
+from flask import Flask, has_request_context, request as flask_request
 
 from app.figures_builder import (
     prepare_data,    
@@ -14,40 +16,276 @@ from app.figures_builder import (
     create_fig_1,
     create_fig_2,
     create_fig_3,
-    create_fig_4
+    create_fig_4,
+    POINT_BUDGET
+)
+from app.data_store import label_to_ordinal, ordinal_to_label
+from app.data_sources import FileSource, SQLiteSource, MongoSource, get_origin_source
+from app.shared_dataset import SharedSource, SharedDatasetWatcher
+from app.settings import (
+    USE_MONGO, DATA_SOURCE, DATA_PATH, PREPARED_CACHE, PREPARED_CACHE_DIR,
+    MONGODB_URI, DB_NAME, COLLECTION, MONGO_FIELDS, MONGO_POOL_SIZE, SQLITE_PATH, SQLITE_QUERY,
+    SHARED_DATASET_DIR, SHARED_POLL_INTERVAL
+)
+from app.refresher import MongoRefresher, is_affected
+from app.workers import WorkerPool, api_pool, run_blocking, iterate_blocking
+from app.wsgi_bridge import PooledWSGIApp
+from app.profiling import (
+    PROFILING, PROFILE_HEADER, ProfilingMiddleware, list_profiles, profile_path, profile_request
+)
+from app.instrumentation import (
+    METRICS_ENABLED, DATA_LOAD_SECONDS, FIGURE_SERIALIZE_SECONDS, RENDER_TAB_SECONDS,
+    Gauge, MetricsMiddleware, registry, timed
+)
+from app.figure_cache import FigureCache
+from app.figure_payload import FigurePayload
+from app.data_api import (
+    StaleCursorError, paginate, parse_columns, take, json_records, iter_ndjson, iter_csv, resolve_format
+)
+from app.arrow_io import (
+    ARROW_STREAM_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    frame_to_table,
+    take_rows,
+    arrow_stream_bytes,
+    parquet_bytes
 )
 
 load_dotenv()
 
-USE_MONGO = os.getenv("USE_MONGO", "false").lower() == "true"
-DATA_PATH = os.getenv("DATA_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "financial_data.json"))
-MONGODB_URI = os.getenv("MONGODB_URI", "")
-DB_NAME = os.getenv("DB_NAME", "financial")
-COLLECTION = os.getenv("COLLECTION", "metrics")
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "0"))
+REFRESH_MODE = os.getenv("REFRESH_MODE", "poll").lower()
+FIGURE_CACHE_SIZE = int(os.getenv("FIGURE_CACHE_SIZE", "16"))
+FIGURE_MODE = os.getenv("FIGURE_MODE", "callback").lower()
+# auto: WebGL + downsampling once fig1/fig2 exceed LARGE_DATASET_POINTS; on/off forces it.
+FIGURE_LARGE_MODE = {"on": True, "off": False}.get(os.getenv("FIGURE_LARGE_MODE", "auto").lower())
+FIGURE_POINT_BUDGET = int(os.getenv("FIGURE_POINT_BUDGET", str(POINT_BUDGET)))
+# The dashboard's initial selection: the first companies by symbol and the latest
+# quarters, so the first page does not grow with the dataset (0: everything).
+DEFAULT_COMPANIES = int(os.getenv("DEFAULT_COMPANIES", "20"))
+DEFAULT_QUARTERS = int(os.getenv("DEFAULT_QUARTERS", "40"))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "256"))
+PRELOAD = os.getenv("PRELOAD", "true").lower() == "true"
+DASH_WORKERS = int(os.getenv("DASH_WORKERS", "4"))
+DASH_PATH = "/dashboard/"
+
+def get_data_source():
+    origin = get_origin_source()
+    if SHARED_DATASET_DIR:
+        # Several workers: attach the dataset a loader published instead of each loading it.
+        return SharedSource(SHARED_DATASET_DIR, origin)
+    return origin
 
-def get_data_from_json():
-    return pd.read_json(DATA_PATH, encoding="utf-8")
+def get_data_from_json(path=DATA_PATH):
+    return FileSource(path, PREPARED_CACHE_DIR if PREPARED_CACHE else None).load_sync()
+
+def get_data_from_sqlite(path=SQLITE_PATH):
+    return SQLiteSource(path, SQLITE_QUERY).load_sync()
 
 def get_data_from_mongo():
-    client = MongoClient(MONGODB_URI)
-    col = client[DB_NAME][COLLECTION]
-    records = list(col.find({}, {"_id": 0}))
-    if not records:
-        raise ValueError("MongoDB collection is empty.")
-    return pd.DataFrame(records)
+    return MongoSource(MONGODB_URI, DB_NAME, COLLECTION, MONGO_FIELDS, MONGO_POOL_SIZE).load_sync()
+
+data_source = get_data_source()
+
+# The dataset is loaded on first use: awaited by the API (and at server startup),
+# or synchronously by callers without an event loop such as Dash callbacks.
+store = None
+company_colors = None
+store_lock = threading.Lock()
+refresher = None
+
+def set_store(new_store):
+    global store, company_colors
+    colors = generate_company_colors(new_store.frame)
+    store, company_colors = new_store, colors
+
+def loaded(df):
+    with store_lock:
+        if store is None:
+            set_store(data_source.make_store(df))
+            print(f"Loaded {len(store)} records from {data_source.name}")
+            start_refresher()
+    return store
+
+def current_store():
+    if store is None:
+        with timed(DATA_LOAD_SECONDS, source=data_source.name):
+            df = data_source.load_sync()
+        loaded(df)
+    return store
+
+async def get_store():
+    if store is None:
+        with timed(DATA_LOAD_SECONDS, source=data_source.name):
+            df = await data_source.load()
+        loaded(df)
+    return store
+
+def figure_frame(companies=None, from_quarter=None, to_quarter=None) -> tuple:
+    """
+    Rows and aggregates a figure is built from: the whole dataset, or the rows of the
+    selected companies within inclusive quarter ordinals, read through the store's
+    indexes (the builder then aggregates just those rows).
+    """
+    if companies is None and from_quarter is None and to_quarter is None:
+        return store.frame, store.stats
+    return store.frame.iloc[store.select(companies, from_quarter, to_quarter)], None
+
+def build_fig_1(metric=None, **selection):
+    # Without a metric the figure carries its own CCP/LTD dropdown; with one (from the
+    # dashboard's controls) only that metric's lines are built.
+    frame, _ = figure_frame(**selection)
+    return create_fig_1(frame, company_colors, FIGURE_LARGE_MODE, FIGURE_POINT_BUDGET,
+                        metric or "both", menu=metric is None)
+
+def build_fig_2(**selection):
+    frame, _ = figure_frame(**selection)
+    return create_fig_2(frame, company_colors, FIGURE_LARGE_MODE, FIGURE_POINT_BUDGET)
+
+def build_fig_3(**selection):
+    frame, stats = figure_frame(**selection)
+    return create_fig_3(frame, stats)
+
+def build_fig_4(**selection):
+    frame, stats = figure_frame(**selection)
+    return create_fig_4(frame, company_colors, stats)
+
+FIGURE_BUILDERS = {"fig1": build_fig_1, "fig2": build_fig_2, "fig3": build_fig_3, "fig4": build_fig_4}
+METRICS = ("CCP", "LTD", "both")
+TAB_FIGURES = {"tab1": "fig1", "tab2": "fig2", "tab3": "fig3", "tab4": "fig4"}
+
+figure_cache = FigureCache(maxsize=FIGURE_CACHE_SIZE)
+api_cache = FigureCache(maxsize=API_CACHE_SIZE)
+
+def apply_update(rows):
+    """
+    Merges new or changed rows into the dataset and keeps every cached figure and
+    API response that does not depend on the affected companies and quarters.
+    """
+    with store_lock:
+        old = store
+        new, companies, quarters = old.merge(prepare_data(rows))
+        set_store(new)
+
+    if set(new.companies) != set(old.companies):
+        # Palette assignment depends on the set of companies: nothing can be kept.
+        keep = lambda key: False
+    else:
+        keep = lambda key: not is_affected(key, companies, quarters)
+    figure_cache.carry_over(old.version, new.version, keep)
+    api_cache.carry_over(old.version, new.version, keep)
+    print(f"Merged {len(rows)} records ({len(companies)} companies); dataset version {new.version}")
+
+def swap_store(new):
+    """
+    Replaces the dataset with a newly published version. Cached figures and
+    responses of the old version are dropped rather than left to age out.
+    """
+    with store_lock:
+        set_store(new)
+    figure_cache.clear()
+    api_cache.clear()
+    print(f"Attached shared dataset version {new.version} ({len(new)} records)")
+
+def start_refresher():
+    global refresher
+    if isinstance(data_source, SharedSource) and SHARED_POLL_INTERVAL > 0 and refresher is None:
+        refresher = SharedDatasetWatcher(data_source, swap_store, SHARED_POLL_INTERVAL)
+        refresher.start()
+    if isinstance(data_source, MongoSource) and REFRESH_INTERVAL > 0 and refresher is None:
+        refresher = MongoRefresher(data_source.collection(), MONGO_FIELDS, apply_update,
+                                   high_water=data_source.high_water, interval=REFRESH_INTERVAL, mode=REFRESH_MODE)
+        refresher.start()
+
+def get_figure(figure_id, **params):
+    version = current_store().version
+    key = FigureCache.make_key(figure_id, version, params)
+    return figure_cache.get_or_build(key, lambda: FIGURE_BUILDERS[figure_id](**params))
+
+def figure_params(figure_id, companies=None, from_quarter=None, to_quarter=None, metric=None) -> dict:
+    """
+    Normalized figure-cache params for a dashboard selection, so equivalent
+    selections share one cache entry. Selecting no companies or all of them, and
+    quarter bounds at or beyond the data's range, mean "no filter"; metric only
+    applies to fig1, which has its own metric dropdown when none is given.
+    Quarter bounds accept ordinals or labels.
+    Raises ValueError for bad labels or a selection without rows.
+    """
+    store = current_store()
+    params = {}
+    if companies:
+        selected = tuple(sorted(set(companies) & set(store.company_ranges)))
+        if not selected:
+            raise ValueError("None of the selected companies are in the dataset.")
+        if len(selected) < len(store.company_ranges):
+            params["companies"] = selected
+
+    quarters = store.quarters
+    if isinstance(from_quarter, str):
+        from_quarter = label_to_ordinal(from_quarter)
+    if isinstance(to_quarter, str):
+        to_quarter = label_to_ordinal(to_quarter)
+    if from_quarter is not None and quarters and from_quarter > quarters[0]:
+        params["from_quarter"] = int(from_quarter)
+    if to_quarter is not None and quarters and to_quarter < quarters[-1]:
+        params["to_quarter"] = int(to_quarter)
+
+    if metric is not None and metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric!r}")
+    if figure_id == "fig1" and metric is not None:
+        params["metric"] = metric
+
+    if params and not len(store.select(params.get("companies"), params.get("from_quarter"), params.get("to_quarter"))):
+        raise ValueError("No data for the selected companies and quarters.")
+    return params
+
+def get_figure_payload(figure_id, **params):
+    version = current_store().version
+    key = FigureCache.make_key(figure_id, version, {**params, "format": "json"})
+
+    def build():
+        fig = get_figure(figure_id, **params)
+        with timed(FIGURE_SERIALIZE_SECONDS, figure=figure_id):
+            return FigurePayload.from_figure(fig)
 
-result_df = get_data_from_mongo() if USE_MONGO else get_data_from_json()
-result_df = prepare_data(result_df)
-print(f"Loaded {len(result_df)} records from {'MongoDB' if USE_MONGO else 'JSON'}")
+    return figure_cache.get_or_build(key, build)
 
-company_colors = generate_company_colors(result_df)
+def get_api_payload(store, name, build):
+    """
+    JSON body for an API resource, built once per dataset version.
+    The ETag is derived from the dataset version, so it changes only when the data does.
+    """
+    key = FigureCache.make_key(name, store.version)
+    etag = f'"{store.version}-{name}"'
+    return api_cache.get_or_build(key, lambda: FigurePayload(build().encode("utf-8"), etag=etag))
 
-fig1 = create_fig_1(result_df, company_colors)
-fig2 = create_fig_2(result_df, company_colors)
-fig3 = create_fig_3(result_df)
-fig4 = create_fig_4(result_df, company_colors)
+def binary_table_body(table, format):
+    try:
+        if format == "arrow":
+            return arrow_stream_bytes(table), ARROW_STREAM_MEDIA_TYPE
+        return parquet_bytes(table), PARQUET_MEDIA_TYPE
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
 
-api = FastAPI(title="Financial Dashboard API", version="2.0")
+def payload_response(request, payload, media_type="application/json"):
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if payload.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    encoding, body = payload.negotiate(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+@asynccontextmanager
+async def lifespan(app):
+    if PRELOAD:
+        await get_store()
+    yield
+    if refresher is not None:
+        refresher.stop()
+
+api = FastAPI(title="Financial Dashboard API", version="2.0", lifespan=lifespan)
 
 api.add_middleware(
     CORSMiddleware,
@@ -55,59 +293,321 @@ api.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+def dataset_gauge(read):
+    return lambda: read(store) if store is not None else None
+
+for name, help, read in (
+    ("dashboard_dataset_rows", "Rows in the loaded dataset.", len),
+    ("dashboard_dataset_companies", "Companies in the loaded dataset.", lambda s: len(s.company_ranges)),
+    ("dashboard_dataset_quarters", "Reporting quarters in the loaded dataset.", lambda s: len(s.quarter_ranges)),
+    ("dashboard_dataset_bytes", "Memory held by the loaded dataset's columns.", lambda s: int(s.frame.memory_usage().sum())),
+    ("dashboard_figure_cache_entries", "Figures and payloads held in the figure cache.", lambda s: figure_cache.stats()["size"]),
+):
+    registry.register(Gauge(name, help, dataset_gauge(read)))
+
+if METRICS_ENABLED:
+    # Without METRICS_ENABLED neither the middleware nor /metrics exist, and the
+    # timing hooks elsewhere are no-ops.
+    api.add_middleware(MetricsMiddleware)
+
+    @api.get("/metrics", include_in_schema=False)
+    async def get_prometheus_metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+if PROFILING != "off":
+    # Dash profiles its own callbacks (render_tab), on the thread that runs them.
+    api.add_middleware(ProfilingMiddleware, skip_prefixes=(DASH_PATH,))
+
+    @api.get("/profiles", include_in_schema=False)
+    async def get_profiles():
+        return await run_blocking(list_profiles)
+
+    @api.get("/profiles/{name}", include_in_schema=False)
+    async def get_profile(name: str):
+        try:
+            path = profile_path(name)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Unknown profile: {name}")
+        return FileResponse(path, filename=name)
+
 @api.get("/health")
-def health():
-    return {"status": "ok", "records": len(result_df), "source": "MongoDB" if USE_MONGO else "JSON"}
+async def health():
+    store = await get_store()
+    return {
+        "status": "ok",
+        "records": len(store),
+        "source": data_source.name,
+        "dataset_version": store.version,
+        "figure_cache": figure_cache.stats(),
+        "api_cache": api_cache.stats(),
+        "refresher": refresher.stats() if refresher else None,
+        "workers": {"api": api_pool.stats(), "dash": dash_pool.stats() if dash_pool else None},
+    }
 
 @api.get("/data")
-def get_data():
-    return result_df.to_dict(orient="records")
+async def get_data(
+    request: Request,
+    symbol: list[str] | None = Query(None),
+    from_quarter: str | None = None,
+    to_quarter: str | None = None,
+    columns: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+    format: str | None = Query(None, pattern="^(json|ndjson|csv|arrow|parquet)$"),
+):
+    store = await get_store()
+    format = resolve_format(format, request.headers.get("accept"))
+
+    def select():
+        selected_columns = parse_columns(columns, store.frame.columns)
+        rows = store.select(symbol, from_quarter, to_quarter)
+        return (selected_columns,) + paginate(rows, store.version, cursor, limit)
+
+    try:
+        selected_columns, rows, next_cursor = await run_blocking(select)
+    except StaleCursorError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if format == "ndjson":
+        return StreamingResponse(iterate_blocking(iter_ndjson(store.frame, rows, selected_columns)),
+                                 media_type="application/x-ndjson", headers=headers)
+    if format == "csv":
+        return StreamingResponse(iterate_blocking(iter_csv(store.frame, rows, selected_columns)),
+                                 media_type="text/csv", headers=headers)
+    if format in ("arrow", "parquet"):
+        def encode():
+            table = take_rows(store.arrow_table(), rows)
+            if selected_columns is not None:
+                table = table.select(selected_columns)
+            return binary_table_body(table, format)
+
+        body, media_type = await run_blocking(encode)
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    def encode_json():
+        # JSONResponse renders its body on construction, so this stays off the event loop.
+        records = json_records(take(store.frame, rows, selected_columns))
+        return JSONResponse(jsonable_encoder(records), headers=headers)
+
+    return await run_blocking(encode_json)
+
+@api.get("/figures/{figure_id}")
+async def get_figure_json(
+    figure_id: str,
+    request: Request,
+    symbol: list[str] | None = Query(None),
+    from_quarter: str | None = None,
+    to_quarter: str | None = None,
+    metric: str | None = Query(None, pattern="^(CCP|LTD|both)$"),
+):
+    if figure_id not in FIGURE_BUILDERS:
+        raise HTTPException(status_code=404, detail=f"Unknown figure: {figure_id}")
+
+    await get_store()
+    try:
+        params = await run_blocking(figure_params, figure_id, symbol, from_quarter, to_quarter, metric)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return payload_response(request, await run_blocking(get_figure_payload, figure_id, **params))
+
+@api.get("/companies")
+async def get_companies(request: Request):
+    store = await get_store()
+    payload = await run_blocking(
+        get_api_payload, store, "companies", lambda: store.company_summary().to_json(orient="records")
+    )
+    return payload_response(request, payload)
+
+@api.get("/quarters")
+async def get_quarters(request: Request):
+    store = await get_store()
+    payload = await run_blocking(
+        get_api_payload, store, "quarters", lambda: store.quarter_summary().to_json(orient="records")
+    )
+    return payload_response(request, payload)
+
+@api.get("/metrics/{company}")
+async def get_metrics(
+    company: str,
+    request: Request,
+    format: str | None = Query(None, pattern="^(json|arrow|parquet)$"),
+):
+    store = await get_store()
+    symbol = company.upper()
+    if symbol not in store.company_ranges:
+        raise HTTPException(status_code=404, detail=f"Unknown company: {company}")
+
+    format = resolve_format(format, request.headers.get("accept"))
+    if format in ("arrow", "parquet"):
+        def encode():
+            try:
+                table = frame_to_table(store.metrics(symbol))
+            except ImportError as e:
+                raise HTTPException(status_code=501, detail=str(e))
+            return binary_table_body(table, format)
+
+        body, media_type = await run_blocking(encode)
+        return Response(content=body, media_type=media_type)
+
+    payload = await run_blocking(
+        get_api_payload, store, f"metrics/{symbol}",
+        lambda: store.metrics(symbol).to_json(orient="records", date_format="iso", date_unit="s")
+    )
+    return payload_response(request, payload)
 
 flask_app = Flask(__name__)
-dash_app = Dash(__name__, server=flask_app, url_base_pathname="/dashboard/")
+dash_app = Dash(__name__, server=flask_app, url_base_pathname=DASH_PATH)
 
-dash_app.layout = html.Div([
-    html.H1("Financial Dashboard", style={"textAlign": "center", "marginBottom": "20px"}),
-    html.Div(
+def filter_controls(store=None):
+    """
+    Company, quarter-range and metric controls, built from the store's indexes
+    (empty without a store). They start on the DEFAULT_COMPANIES first companies
+    and the DEFAULT_QUARTERS latest quarters.
+    """
+    quarters = store.quarters if store is not None else []
+    companies = store.companies if store is not None else []
+    marks_every = max(1, len(quarters) // 8)
+    first_quarter = quarters[-DEFAULT_QUARTERS] if 0 < DEFAULT_QUARTERS < len(quarters) else (quarters or [0])[0]
+    return html.Div(
         [
-            html.P(
-                [
-                    "This dashboard analyzes how companies balance liquidity and long-term leverage over time.",
-                    html.Br(),
-                    "Interactive charts reveal cash strength, debt pressure, structural shifts, ",
-                    "and relative financial resilience across reporting periods."
+            dcc.Dropdown(
+                id="company-filter",
+                options=[
+                    {"label": f"{name} ({symbol})", "value": symbol}
+                    for symbol, name in (store.company_names.items() if store is not None else ())
                 ],
-                style={
-                    "textAlign": "center",
-                    "maxWidth": "900px",
-                    "margin": "0 auto",
-                    "fontSize": "16px",
-                    "color": "#333"
-                }
-            )
+                value=companies[:DEFAULT_COMPANIES] if 0 < DEFAULT_COMPANIES < len(companies) else None,
+                multi=True,
+                placeholder="All companies",
+                style={"flex": "2"},
+            ),
+            html.Div(
+                dcc.RangeSlider(
+                    id="quarter-range",
+                    min=quarters[0] if quarters else 0,
+                    max=quarters[-1] if quarters else 0,
+                    step=1,
+                    value=[first_quarter, quarters[-1]] if quarters else [0, 0],
+                    marks={q: ordinal_to_label(q) for q in quarters[::marks_every]},
+                    allowCross=False,
+                ),
+                style={"flex": "3"},
+            ),
+            dcc.RadioItems(
+                id="metric",
+                options=[{"label": label, "value": value} for label, value in (("CCP", "CCP"), ("LTD", "LTD"), ("Both", "both"))],
+                value="both",
+                inline=True,
+            ),
         ],
-        style={"marginBottom": "25px"}
-    ),
-    dcc.Tabs(id="tabs", value="tab1", children=[
-        dcc.Tab(label="CCP & LTD by Company", value="tab1"),
-        dcc.Tab(label="Debt Coverage Ratio", value="tab2"),
-        dcc.Tab(label="Financial Resilience (Heatmap)", value="tab3"),
-        dcc.Tab(label="Debt vs Liquid Assets", value="tab4"),
-    ]),
-    html.Div(id="tabs-content", style={"marginTop": "20px"}),
-])
-
-@dash_app.callback(Output("tabs-content", "children"), Input("tabs", "value"))
-def render_tab(tab):
-    if tab == "tab1": return html.Div([dcc.Graph(figure=fig1)])
-    elif tab == "tab2": return html.Div([dcc.Graph(figure=fig2)])
-    elif tab == "tab3": return html.Div([dcc.Graph(figure=fig3)])
-    elif tab == "tab4": return html.Div([dcc.Graph(figure=fig4)])
-    return html.Div("Figure not available.", style={"textAlign": "center", "color": "red"})
-
-api.mount("/", WSGIMiddleware(flask_app))
+        style={"display": "flex", "gap": "20px", "alignItems": "center", "maxWidth": "1200px", "margin": "0 auto 20px"}
+    )
+
+def serve_layout():
+    return html.Div([
+        html.H1("Financial Dashboard", style={"textAlign": "center", "marginBottom": "20px"}),
+        html.Div(
+            [
+                html.P(
+                    [
+                        "This dashboard analyzes how companies balance liquidity and long-term leverage over time.",
+                        html.Br(),
+                        "Interactive charts reveal cash strength, debt pressure, structural shifts, ",
+                        "and relative financial resilience across reporting periods."
+                    ],
+                    style={
+                        "textAlign": "center",
+                        "maxWidth": "900px",
+                        "margin": "0 auto",
+                        "fontSize": "16px",
+                        "color": "#333"
+                    }
+                )
+            ],
+            style={"marginBottom": "25px"}
+        ),
+        # Dash also calls this once at import to collect component ids; that must not load the data.
+        filter_controls(current_store() if has_request_context() else None),
+        dcc.Tabs(id="tabs", value="tab1", children=[
+            dcc.Tab(label="CCP & LTD by Company", value="tab1"),
+            dcc.Tab(label="Debt Coverage Ratio", value="tab2"),
+            dcc.Tab(label="Financial Resilience (Heatmap)", value="tab3"),
+            dcc.Tab(label="Debt vs Liquid Assets", value="tab4"),
+        ]),
+        html.Div(
+            [dcc.Graph(id="tab-graph")] if FIGURE_MODE == "precomputed" else [],
+            id="tabs-content",
+            style={"marginTop": "20px"}
+        ),
+    ])
+
+# A function, so the controls follow the dataset loaded (or refreshed) by the time a page is served.
+dash_app.layout = serve_layout
+
+def render_tab(tab, companies=None, quarter_range=None, metric="both"):
+    if tab not in TAB_FIGURES:
+        return html.Div("Figure not available.", style={"textAlign": "center", "color": "red"})
+    figure_id = TAB_FIGURES[tab]
+    from_quarter, to_quarter = quarter_range or (None, None)
+    profile_header = flask_request.headers.get(PROFILE_HEADER) if has_request_context() else None
+    with timed(RENDER_TAB_SECONDS, tab=tab), profile_request(f"render_tab {tab}", profile_header):
+        try:
+            params = figure_params(figure_id, companies, from_quarter, to_quarter, metric)
+        except ValueError as e:
+            return html.Div(str(e), style={"textAlign": "center", "color": "red"})
+        return html.Div([dcc.Graph(figure=get_figure(figure_id, **params))])
+
+FILTER_INPUTS = [
+    Input("tabs", "value"),
+    Input("company-filter", "value"),
+    Input("quarter-range", "value"),
+    Input("metric", "value"),
+]
+
+if FIGURE_MODE == "precomputed":
+    # The browser fetches /figures/<id> itself; the ETag makes repeat tab switches a 304.
+    dash_app.clientside_callback(
+        """
+        function(tab, companies, range, metric) {
+            const figures = %s;
+            if (!(tab in figures)) {
+                return {};
+            }
+            const label = q => Math.floor(q / 4) + "Q" + (q %% 4 + 1);
+            const params = new URLSearchParams();
+            (companies || []).forEach(symbol => params.append("symbol", symbol));
+            if (range) {
+                params.set("from_quarter", label(range[0]));
+                params.set("to_quarter", label(range[1]));
+            }
+            if (figures[tab] === "fig1" && metric) {
+                params.set("metric", metric);
+            }
+            return fetch("/figures/" + figures[tab] + "?" + params)
+                .then(response => response.ok ? response.json() : {});
+        }
+        """ % json.dumps(TAB_FIGURES),
+        Output("tab-graph", "figure"),
+        *FILTER_INPUTS,
+    )
+else:
+    dash_app.callback(Output("tabs-content", "children"), *FILTER_INPUTS)(render_tab)
+
+if DASH_WORKERS > 0:
+    # Dash callbacks and assets get their own pool, so a burst of dashboard users
+    # queues there instead of in front of API requests.
+    dash_pool = WorkerPool("dash-wsgi", DASH_WORKERS)
+    api.mount("/", PooledWSGIApp(flask_app, dash_pool))
+else:
+    from fastapi.middleware.wsgi import WSGIMiddleware
+    dash_pool = None
+    api.mount("/", WSGIMiddleware(flask_app))
 
 if __name__ == "__main__":
     import uvicorn
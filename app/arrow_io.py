@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+ARROW_BATCH_ROWS = 64 * 1024
+
+
+def _pyarrow():
+    """
+    Imports pyarrow (and pyarrow.parquet) on first use rather than at module import.
+    This defers the import, it does not avoid it: pandas 2.x imports pyarrow
+    itself when it is installed, as it is from requirements.txt.
+    Raises ImportError with a clear message when it is missing.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Arrow and Parquet output require the 'pyarrow' package.") from e
+    return pyarrow
+
+
+def frame_to_table(frame: pd.DataFrame, categoricals: dict = None):
+    """
+    Converts a DataFrame to an Arrow table. Numeric and Arrow-backed columns are
+    wrapped without copying; columns given in `categoricals` (name -> pd.Categorical)
+    become dictionary arrays built from the existing codes.
+    """
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    arrow_backed = {name for name, dtype in frame.dtypes.items() if isinstance(dtype, pd.ArrowDtype)}
+    if arrow_backed and table.schema.metadata and b"pandas" in table.schema.metadata:
+        # Describe Arrow-backed string columns to pandas readers as the object columns they
+        # stand in for, so clients get the same dtypes however the dataset was loaded.
+        metadata = json.loads(table.schema.metadata[b"pandas"])
+        for column in metadata["columns"]:
+            if column["name"] in arrow_backed and column["pandas_type"] == "unicode":
+                column["numpy_type"] = "object"
+        table = table.replace_schema_metadata({**table.schema.metadata, b"pandas": json.dumps(metadata).encode()})
+    for name, values in (categoricals or {}).items():
+        dictionary = pa.DictionaryArray.from_arrays(
+            pa.array(values.codes, mask=values.codes < 0),
+            pa.array(values.categories.to_numpy(dtype=object))
+        )
+        table = table.set_column(table.schema.get_field_index(name), name, dictionary)
+    return table
+
+
+def take_rows(table, rows: np.ndarray):
+    """
+    Selects row positions from a table; contiguous ranges are zero-copy slices.
+    """
+    if len(rows) == table.num_rows:
+        return table
+    if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+        return table.slice(int(rows[0]), len(rows))
+    return table.take(_pyarrow().array(rows))
+
+
+def arrow_stream_bytes(table) -> bytes:
+    pa = _pyarrow()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=ARROW_BATCH_ROWS)
+    return sink.getvalue().to_pybytes()
+
+
+def parquet_bytes(table) -> bytes:
+    pa = _pyarrow()
+    sink = pa.BufferOutputStream()
+    pa.parquet.write_table(table, sink, compression="snappy")
+    return sink.getvalue().to_pybytes()
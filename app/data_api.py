@@ -0,0 +1,129 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+from app.arrow_io import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE
+
+
+STREAM_CHUNK_ROWS = 10_000
+
+ACCEPT_FORMATS = {
+    ARROW_STREAM_MEDIA_TYPE: "arrow",
+    PARQUET_MEDIA_TYPE: "parquet",
+    "application/x-parquet": "parquet",
+    "application/x-ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+
+class StaleCursorError(ValueError):
+    """
+    Raised when a pagination cursor was issued for a different dataset version.
+    """
+
+
+def encode_cursor(version: str, position: int) -> str:
+    """
+    Opaque cursor pointing just past the given row position of a dataset version.
+    """
+    return base64.urlsafe_b64encode(f"{version}:{position}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_version, position = base64.urlsafe_b64decode(padded).decode().rsplit(":", 1)
+        position = int(position)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed cursor.")
+    if cursor_version != version:
+        raise StaleCursorError("Dataset changed since this cursor was issued; restart pagination.")
+    return position
+
+
+def paginate(rows: np.ndarray, version: str, cursor: str = None, limit: int = None) -> tuple:
+    """
+    Cuts one page out of sorted row positions.
+    Returns (page rows, next cursor or None when this is the last page).
+    """
+    if cursor:
+        rows = rows[np.searchsorted(rows, decode_cursor(cursor, version), side="right"):]
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(version, int(rows[-1]))
+
+
+def resolve_format(format: str, accept: str) -> str:
+    """
+    An explicit ?format= wins; otherwise the first known media type in the Accept
+    header picks the format, falling back to JSON.
+    """
+    if format:
+        return format
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in ACCEPT_FORMATS:
+            return ACCEPT_FORMATS[media_type]
+    return "json"
+
+
+def parse_columns(columns: str, available) -> list:
+    """
+    Parses a comma-separated column projection, keeping the requested order.
+    Returns None (all columns) for an empty projection.
+    """
+    if not columns:
+        return None
+    requested = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in requested if c not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return requested
+
+
+def take(frame: pd.DataFrame, rows: np.ndarray, columns: list = None) -> pd.DataFrame:
+    """
+    Rows and columns of frame, without copying when the selection is the whole frame.
+    """
+    if columns is not None:
+        frame = frame[columns]
+    if len(rows) == len(frame):
+        return frame
+    return frame.iloc[rows]
+
+
+def json_records(frame: pd.DataFrame) -> list:
+    """
+    Rows as dicts for a JSON response, with missing values (NaN, NaT) as None so
+    they encode as null, as in the ndjson and CSV formats.
+    """
+    nullable = {name: column for name, column in frame.items() if column.hasnans}
+    if nullable:
+        frame = frame.assign(**{
+            name: column.astype(object).where(column.notna(), None) for name, column in nullable.items()
+        })
+    return frame.to_dict(orient="records")
+
+
+def iter_ndjson(frame: pd.DataFrame, rows: np.ndarray, columns: list = None, chunk_rows: int = STREAM_CHUNK_ROWS):
+    """
+    Encodes the selected rows as newline-delimited JSON, one chunk of rows at a time.
+    """
+    for start in range(0, len(rows), chunk_rows):
+        chunk = take(frame, rows[start:start + chunk_rows], columns)
+        text = chunk.to_json(orient="records", lines=True, date_format="iso", date_unit="s")
+        yield text if text.endswith("\n") else text + "\n"
+
+
+def iter_csv(frame: pd.DataFrame, rows: np.ndarray, columns: list = None, chunk_rows: int = STREAM_CHUNK_ROWS):
+    """
+    Encodes the selected rows as CSV, one chunk of rows at a time. The header is
+    written once, even for an empty selection.
+    """
+    header = frame.columns if columns is None else columns
+    yield pd.DataFrame(columns=header).to_csv(index=False)
+    for start in range(0, len(rows), chunk_rows):
+        chunk = take(frame, rows[start:start + chunk_rows], columns)
+        yield chunk.to_csv(index=False, header=False)
@@ -0,0 +1,164 @@
+import os
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from app import settings
+from app.data_store import DataStore
+from app.figures_builder import prepare_data
+from app.mongo_source import (
+    DASHBOARD_FIELDS,
+    get_client,
+    get_async_client,
+    load_collection,
+    load_collection_async,
+    latest_id,
+    latest_id_async
+)
+from app.prepared_cache import load_prepared
+from app.sqlite_source import FILINGS_QUERY, load_filings
+from app.workers import run_blocking
+
+
+class DataSource(ABC):
+    """
+    Where the dataset comes from. Both loaders return the prepared frame.
+
+    load() is awaited by the API and must not block the event loop; by default it
+    runs load_sync() on the bounded API pool. load_sync() serves callers without an
+    event loop (Dash callbacks, scripts, benchmarks).
+    """
+
+    name = "unknown"
+
+    async def load(self) -> pd.DataFrame:
+        return await run_blocking(self.load_sync)
+
+    @abstractmethod
+    def load_sync(self) -> pd.DataFrame:
+        ...
+
+    def make_store(self, df: pd.DataFrame) -> DataStore:
+        """
+        The DataStore for a frame returned by this source.
+        """
+        return DataStore(df)
+
+
+class FileSource(DataSource):
+    """
+    JSON, Parquet or Arrow/Feather file, picked by extension. With a cache_dir the
+    prepared frame is cached on disk (see prepared_cache) in store order, along with
+    its version, so the store is built on the memory-mapped columns without copying.
+    """
+
+    READERS = {
+        ".json": lambda path: pd.read_json(path, encoding="utf-8"),
+        ".parquet": pd.read_parquet,
+        ".arrow": pd.read_feather,
+        ".feather": pd.read_feather,
+    }
+
+    def __init__(self, path: str, cache_dir: str = None):
+        self.path = path
+        self.cache_dir = cache_dir
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in self.READERS:
+            raise ValueError(f"Unsupported data file type: {extension}")
+        self.name = "Parquet" if extension == ".parquet" else extension.lstrip(".").upper()
+        self._reader = self.READERS[extension]
+        self.version = None
+
+    def read(self) -> pd.DataFrame:
+        return self._reader(self.path)
+
+    def load_sync(self) -> pd.DataFrame:
+        if self.cache_dir:
+            frame, self.version = load_prepared(self.path, self._build, self.cache_dir)
+            return frame
+        self.version = None
+        return prepare_data(self.read())
+
+    def make_store(self, df: pd.DataFrame) -> DataStore:
+        if self.version is None:
+            return DataStore(df)
+        return DataStore(df, presorted=True, version=self.version)
+
+    def _build(self) -> tuple:
+        store = DataStore(prepare_data(self.read()))
+        return store.frame, store.version
+
+
+class SQLiteSource(DataSource):
+    """
+    Result of one SQL query against a SQLite file, opened read-only. By default the
+    dashboard dataset is joined from the Forms, Tasks and Stocks tables of the filings
+    database; `python -m app.sqlite_source index` creates the indexes that join uses.
+    """
+
+    name = "SQLite"
+
+    def __init__(self, path: str, query: str = None):
+        self.path = path
+        self.query = query or FILINGS_QUERY
+
+    def read(self) -> pd.DataFrame:
+        return load_filings(self.path, self.query)
+
+    def load_sync(self) -> pd.DataFrame:
+        return prepare_data(self.read())
+
+
+class MongoSource(DataSource):
+    """
+    MongoDB collection. load() uses motor when it is installed and falls back to
+    pymongo on the API pool otherwise. `high_water` holds the highest _id seen
+    before the last load, for the incremental refresher.
+    """
+
+    name = "MongoDB"
+
+    def __init__(self, uri: str, db_name: str, collection: str, fields=DASHBOARD_FIELDS, pool_size: int = 10):
+        self.uri = uri
+        self.db_name = db_name
+        self.collection_name = collection
+        self.fields = tuple(fields)
+        self.pool_size = pool_size
+        self.high_water = None
+
+    def collection(self):
+        return get_client(self.uri, self.pool_size)[self.db_name][self.collection_name]
+
+    def load_sync(self) -> pd.DataFrame:
+        col = self.collection()
+        # Taken before the load, so documents inserted meanwhile are picked up by the refresher.
+        self.high_water = latest_id(col)
+        return self._prepare(load_collection(col, self.fields))
+
+    async def load(self) -> pd.DataFrame:
+        client = get_async_client(self.uri, self.pool_size)
+        if client is None:
+            return await super().load()
+        col = client[self.db_name][self.collection_name]
+        self.high_water = await latest_id_async(col)
+        df = await load_collection_async(col, self.fields)
+        return await run_blocking(self._prepare, df)
+
+    @staticmethod
+    def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            raise ValueError("MongoDB collection is empty.")
+        return prepare_data(df)
+
+
+def get_origin_source() -> DataSource:
+    """
+    The source configured in app.settings (DATA_SOURCE, USE_MONGO, ...).
+    """
+    if settings.USE_MONGO or settings.DATA_SOURCE == "mongo":
+        return MongoSource(
+            settings.MONGODB_URI, settings.DB_NAME, settings.COLLECTION, settings.MONGO_FIELDS, settings.MONGO_POOL_SIZE
+        )
+    if settings.DATA_SOURCE == "sqlite":
+        return SQLiteSource(settings.SQLITE_PATH, settings.SQLITE_QUERY)
+    return FileSource(settings.DATA_PATH, settings.PREPARED_CACHE_DIR if settings.PREPARED_CACHE else None)
@@ -0,0 +1,324 @@
+import hashlib
+import re
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from app.arrow_io import frame_to_table
+from app.quarter_stats import QuarterStats
+
+
+NO_QUARTER = -1
+QUARTER_LABEL = re.compile(r"^(?:(\d{4})-?Q([1-4])|Q([1-4])\s+(\d{4}))$")
+
+
+def quarter_ordinal(year, quarter):
+    """
+    Encodes a (year, quarter) pair as a single integer: year * 4 + (quarter - 1).
+    Works element-wise on NumPy arrays as well as on scalars.
+    """
+    return year * 4 + (quarter - 1)
+
+
+def ordinal_to_label(ordinal: int) -> str:
+    """
+    Converts a quarter ordinal back into the '2023Q4' label used by prepare_data.
+    """
+    year, q = divmod(int(ordinal), 4)
+    return f"{year}Q{q + 1}"
+
+
+def label_to_ordinal(label: str) -> int:
+    """
+    Parses a quarter label into a quarter ordinal.
+    Accepts '2023Q4' (as produced by prepare_data), '2023-Q4' and 'Q4 2023'.
+    """
+    match = QUARTER_LABEL.match(str(label).strip().upper())
+    if not match:
+        raise ValueError(f"Invalid quarter label: {label!r}")
+    year, q, q_alt, year_alt = match.groups()
+    return quarter_ordinal(int(year or year_alt), int(q or q_alt))
+
+
+def _spliced(values: pd.Categorical, added: pd.Series, order: np.ndarray) -> pd.Categorical:
+    """
+    Categorical of `values` followed by `added`, taken in `order`. Only the
+    categories are re-sorted; the codes of existing rows are remapped, not re-hashed.
+    """
+    categories = values.categories.union(pd.Index(added.dropna().unique()))
+    remap = np.append(categories.get_indexer(values.categories), -1)
+    codes = np.concatenate((remap[values.codes], categories.get_indexer(added)))[order]
+    return pd.Categorical.from_codes(codes, categories).remove_unused_categories()
+
+
+class DataStore:
+    """
+    Column-wise, indexed view of the prepared dataset.
+
+    Rows are kept ordered by (Symbol, QuarterStart), so every company occupies one
+    contiguous row range. A second permutation ordered by quarter gives the same
+    property for quarters. Looking up "one company" or "one quarter" is therefore
+    a dictionary hit plus a slice instead of a boolean mask over the whole frame.
+
+    `version` is a content hash of the dataset (for a merged store, of the previous
+    version and the merged rows); caches key on it so that a reload with different
+    data never serves stale figures or responses.
+
+    A frame that is already in store order (the `frame` of another store, e.g. one
+    attached from a shared dataset file) can be passed with presorted=True and its
+    known version; it is then used as is, without copying or hashing it.
+    """
+
+    def __init__(self, df: pd.DataFrame, presorted: bool = False, version: str = None):
+        if presorted:
+            frame = df if df.index.equals(pd.RangeIndex(len(df))) else df.reset_index(drop=True)
+        else:
+            frame = df.sort_values(["Symbol", "QuarterStart"], kind="stable").reset_index(drop=True)
+        self.frame = frame
+
+        self.symbol = pd.Categorical(frame["Symbol"])
+        self.company_name = pd.Categorical(frame["CompanyName"])
+
+        starts = pd.to_datetime(frame["QuarterStart"])
+        quarter = quarter_ordinal(starts.dt.year, (starts.dt.month - 1) // 3 + 1)
+        self.quarter = quarter.fillna(NO_QUARTER).to_numpy(dtype=np.int32)
+
+        self.ccp = frame["CCP"].to_numpy(dtype=np.float64)
+        self.ltd = frame["LTD"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.debt_coverage = np.where(self.ltd != 0, self.ccp / self.ltd, np.nan)
+
+        self._build_company_index()
+        self._build_quarter_index()
+        self.version = version or self._content_version()
+        self._arrow = None
+        self._stats = None
+
+    def _build_company_index(self):
+        codes = self.symbol.codes
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        starts = np.concatenate(([0], bounds)) if len(codes) else np.array([], dtype=int)
+        stops = np.concatenate((bounds, [len(codes)])) if len(codes) else np.array([], dtype=int)
+
+        symbols = np.asarray(self.symbol[starts]).tolist()
+        self.company_ranges = {
+            symbol: slice(int(start), int(stop)) for symbol, start, stop in zip(symbols, starts, stops)
+        }
+        self.company_names = dict(zip(symbols, np.asarray(self.company_name[starts]).tolist()))
+
+    def _build_quarter_index(self):
+        order = np.argsort(self.quarter, kind="stable")
+        valid = order[self.quarter[order] != NO_QUARTER]
+        self.quarter_order = valid
+
+        values = self.quarter[valid]
+        self._sorted_quarters = values
+        uniques, starts = np.unique(values, return_index=True)
+        stops = np.append(starts[1:], len(values))
+        self.quarter_ranges = {
+            int(q): slice(int(start), int(stop))
+            for q, start, stop in zip(uniques, starts, stops)
+        }
+
+    def merge(self, rows: pd.DataFrame) -> tuple:
+        """
+        New store with prepared rows added. A row replaces any existing row for the
+        same (Symbol, QuarterStart), so amended filings supersede earlier ones.
+        Returns (store, affected symbols, affected quarter ordinals).
+
+        Each row is placed into its company's range by a binary search on
+        QuarterStart, and the column arrays and indexes are spliced rather than
+        rebuilt from the frame. The new version hashes the previous version
+        together with the rows, not the whole dataset.
+        """
+        rows = rows[self.frame.columns.intersection(rows.columns)]
+        rows = (
+            rows.drop_duplicates(["Symbol", "QuarterStart"], keep="last")
+                .sort_values(["Symbol", "QuarterStart"], kind="stable")
+                .reset_index(drop=True)
+        )
+        starts = self.frame["QuarterStart"].to_numpy()
+        new_starts = pd.to_datetime(rows["QuarterStart"]).to_numpy()
+        symbols = list(self.company_ranges)
+
+        keep = np.ones(len(self), dtype=bool)
+        positions = np.empty(len(rows), dtype=np.int64)
+        for i, (symbol, start) in enumerate(zip(rows["Symbol"], new_starts)):
+            span = self.company_ranges.get(symbol)
+            if span is None:
+                # A new company goes before the first known symbol that sorts after it.
+                later = bisect_right(symbols, symbol)
+                positions[i] = self.company_ranges[symbols[later]].start if later < len(symbols) else len(self)
+                continue
+            lo = span.start + np.searchsorted(starts[span], start, side="left")
+            hi = span.start + np.searchsorted(starts[span], start, side="right")
+            keep[lo:hi] = False
+            positions[i] = hi
+
+        kept = np.flatnonzero(keep)
+        order = np.insert(kept, np.searchsorted(kept, positions), len(self) + np.arange(len(rows)))
+        frame = pd.concat([self.frame, rows], ignore_index=True).take(order)
+        frame.index = pd.RangeIndex(len(frame))
+
+        merged = DataStore.__new__(DataStore)
+        merged.frame = frame
+        merged.symbol = _spliced(self.symbol, rows["Symbol"], order)
+        merged.company_name = _spliced(self.company_name, rows["CompanyName"], order)
+        row_quarters = quarter_ordinal(new_starts.astype("datetime64[Y]").astype(int) + 1970,
+                                       new_starts.astype("datetime64[M]").astype(int) % 12 // 3 + 1)
+        row_quarters[np.isnat(new_starts)] = NO_QUARTER
+        merged.quarter = np.concatenate((self.quarter, row_quarters.astype(np.int32)))[order]
+        merged.ccp = np.concatenate((self.ccp, rows["CCP"].to_numpy(dtype=np.float64)))[order]
+        merged.ltd = np.concatenate((self.ltd, rows["LTD"].to_numpy(dtype=np.float64)))[order]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            merged.debt_coverage = np.where(merged.ltd != 0, merged.ccp / merged.ltd, np.nan)
+        merged._build_company_index()
+        merged._build_quarter_index()
+        if len(rows):
+            rows_hash = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+            merged.version = hashlib.sha1(self.version.encode() + rows_hash.tobytes()).hexdigest()[:12]
+        else:
+            merged.version = self.version
+        merged._arrow = None
+        merged._stats = self._stats.updated(rows) if self._stats is not None else None
+
+        return merged, set(rows["Symbol"]), set(row_quarters[row_quarters != NO_QUARTER].tolist())
+
+    def _content_version(self) -> str:
+        hashed = pd.util.hash_pandas_object(self.frame, index=False).to_numpy()
+        return hashlib.sha1(hashed.tobytes()).hexdigest()[:12]
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def companies(self) -> list:
+        return list(self.company_ranges)
+
+    @property
+    def quarters(self) -> list:
+        return list(self.quarter_ranges)
+
+    def company_rows(self, symbol: str) -> slice:
+        """
+        Row range of one company. Raises KeyError for unknown symbols.
+        """
+        return self.company_ranges[symbol]
+
+    def quarter_rows(self, quarter) -> np.ndarray:
+        """
+        Row positions of one quarter, given as an ordinal or a '2023Q4' label.
+        """
+        if isinstance(quarter, str):
+            quarter = label_to_ordinal(quarter)
+        return self.quarter_order[self.quarter_ranges[quarter]]
+
+    def select(self, symbols=None, from_quarter=None, to_quarter=None) -> np.ndarray:
+        """
+        Sorted row positions matching the given companies and inclusive quarter bounds.
+        Unknown symbols are ignored; quarter bounds accept ordinals or labels.
+        Only the matching company/quarter ranges are touched, never the whole dataset.
+        """
+        if isinstance(from_quarter, str):
+            from_quarter = label_to_ordinal(from_quarter)
+        if isinstance(to_quarter, str):
+            to_quarter = label_to_ordinal(to_quarter)
+        bounded = from_quarter is not None or to_quarter is not None
+        lo = from_quarter if from_quarter is not None else np.iinfo(np.int32).min
+        hi = to_quarter if to_quarter is not None else np.iinfo(np.int32).max
+
+        if symbols is None:
+            if not bounded:
+                return np.arange(len(self))
+            start = np.searchsorted(self._sorted_quarters, lo, side="left")
+            stop = np.searchsorted(self._sorted_quarters, hi, side="right")
+            return np.sort(self.quarter_order[start:stop])
+
+        ranges = sorted(
+            (self.company_ranges[symbol] for symbol in set(symbols) if symbol in self.company_ranges),
+            key=lambda rows: rows.start
+        )
+        if not ranges:
+            return np.array([], dtype=np.int64)
+        rows = np.concatenate([np.arange(r.start, r.stop) for r in ranges])
+        if bounded:
+            quarters = self.quarter[rows]
+            rows = rows[(quarters >= lo) & (quarters <= hi) & (quarters != NO_QUARTER)]
+        return rows
+
+    def company(self, symbol: str) -> pd.DataFrame:
+        return self.frame.iloc[self.company_rows(symbol)]
+
+    def metrics(self, symbol: str) -> pd.DataFrame:
+        """
+        Quarterly CCP, LTD and DebtCoverage of one company, read from its row range.
+        """
+        rows = self.company_rows(symbol)
+        return pd.DataFrame({
+            "ReportQuarter": self.frame["ReportQuarter"].to_numpy()[rows],
+            "QuarterStart": self.frame["QuarterStart"].to_numpy()[rows],
+            "CCP": self.ccp[rows],
+            "LTD": self.ltd[rows],
+            "DebtCoverage": self.debt_coverage[rows],
+        })
+
+    def arrow_table(self):
+        """
+        Arrow view of the whole dataset, built on first use and shared by every
+        Arrow/Parquet response. Symbol and CompanyName are dictionary-encoded
+        from the categorical codes.
+        """
+        if self._arrow is None:
+            self._arrow = frame_to_table(self.frame, {"Symbol": self.symbol, "CompanyName": self.company_name})
+        return self._arrow
+
+    @property
+    def stats(self) -> QuarterStats:
+        """
+        Per-quarter aggregates, built on first use and carried forward incrementally
+        by merge().
+        """
+        if self._stats is None:
+            self._stats = QuarterStats.from_frame(self.frame)
+        return self._stats
+
+    def company_summary(self) -> pd.DataFrame:
+        """
+        One row per company with its record count and first/last quarter,
+        computed from the company ranges alone.
+        """
+        def label(position):
+            ordinal = self.quarter[position]
+            return None if ordinal == NO_QUARTER else ordinal_to_label(ordinal)
+
+        return pd.DataFrame(
+            [
+                {
+                    "Symbol": symbol,
+                    "CompanyName": self.company_names[symbol],
+                    "Records": rows.stop - rows.start,
+                    "FirstQuarter": label(rows.start),
+                    "LastQuarter": label(rows.stop - 1),
+                }
+                for symbol, rows in self.company_ranges.items()
+            ],
+            columns=["Symbol", "CompanyName", "Records", "FirstQuarter", "LastQuarter"]
+        )
+
+    def quarter_summary(self) -> pd.DataFrame:
+        """
+        One row per reporting quarter with the number of records it holds and its
+        aggregates from `stats`.
+        """
+        summary = pd.DataFrame(
+            [
+                {"ReportQuarter": ordinal_to_label(q), "Quarter": q, "Records": rows.stop - rows.start}
+                for q, rows in self.quarter_ranges.items()
+            ],
+            columns=["ReportQuarter", "Quarter", "Records"]
+        )
+        return summary.merge(self.stats.summary(), on="Quarter", how="left").drop(columns="Quarter")
+
+    def quarter_frame(self, quarter) -> pd.DataFrame:
+        return self.frame.iloc[self.quarter_rows(quarter)]
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of `threshold` points that keep the
+    visual shape of the (x, y) line. The first and last points are always kept;
+    every bucket in between contributes the point forming the largest triangle
+    with the previously kept point and the mean of the next bucket.
+    x must be sorted and both arrays free of NaN.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    buckets = threshold - 2
+    edges = (np.arange(buckets + 1) * ((n - 2) / buckets)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(buckets):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = (mean_x[i + 1], mean_y[i + 1]) if i + 1 < buckets else (x[-1], y[-1])
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Sorted positions to keep from one line: LTTB over its points with finite x
+    and y, plus every point with a NaN x or y so that gaps in the line survive.
+    """
+    mask = np.isfinite(x) & np.isfinite(y)
+    finite = np.flatnonzero(mask)
+    if len(finite) <= threshold:
+        return np.arange(len(y))
+    kept = finite[lttb(x[finite], y[finite], threshold)]
+    return np.union1d(kept, np.flatnonzero(~mask))
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """
+    Bounded LRU cache for built figures.
+
+    Keys are (figure id, dataset version, filter parameters) tuples. A figure is
+    built on the first request for its key; concurrent requests for the same key
+    wait for that build instead of starting their own.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._building = {}
+
+    @staticmethod
+    def make_key(figure_id: str, version: str, params: dict = None) -> tuple:
+        return (figure_id, version, tuple(sorted((params or {}).items())))
+
+    def get_or_build(self, key: tuple, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+
+            try:
+                value = build()
+            except Exception:
+                with self._lock:
+                    self._building.pop(key, None)
+                raise
+
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                self._building.pop(key, None)
+
+        return value
+
+    def carry_over(self, old_version: str, new_version: str, keep):
+        """
+        Moves entries built for old_version to new_version when keep(key) says the
+        data they depend on did not change; every other entry is dropped.
+        """
+        with self._lock:
+            entries = OrderedDict()
+            for key, value in self._entries.items():
+                figure_id, version, params = key
+                if version == old_version and keep(key):
+                    entries[(figure_id, new_version, params)] = value
+                elif version == new_version:
+                    entries[key] = value
+            self._entries = entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import threading
+
+import plotly.io as pio
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def available_encodings() -> list:
+    """
+    Content encodings figure payloads can be served with, in order of preference.
+    """
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def accepted_encodings(accept_encoding: str) -> dict:
+    """
+    Parses an Accept-Encoding header into {coding: q}. Entries without a q-value
+    get 1; entries with a malformed one are ignored.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = None
+        if q is not None:
+            accepted[coding.lower()] = q
+    return accepted
+
+
+class FigurePayload:
+    """
+    A figure (or any other JSON response) serialized once to compact JSON bytes.
+
+    Compressed variants are produced on first use per encoding and kept alongside
+    the raw body, so repeated requests only compare ETags or copy bytes.
+    The ETag defaults to a hash of the body.
+    """
+
+    def __init__(self, body: bytes, etag: str = None):
+        self.body = body
+        self.etag = etag or '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_figure(cls, fig) -> "FigurePayload":
+        return cls(pio.to_json(fig, validate=False, pretty=False).encode("utf-8"))
+
+    def encoded(self, encoding: str) -> bytes:
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == "gzip":
+                    self._encoded[encoding] = gzip.compress(self.body, compresslevel=6, mtime=0)
+                elif encoding == "br" and brotli is not None:
+                    self._encoded[encoding] = brotli.compress(self.body, quality=5)
+                else:
+                    raise ValueError(f"Unsupported encoding: {encoding}")
+            return self._encoded[encoding]
+
+    def negotiate(self, accept_encoding: str) -> tuple:
+        """
+        Picks the supported encoding with the highest q-value the client accepts
+        ("*" covers codings it does not list; q=0 refuses one), preferring the
+        server's order on ties. Returns (encoding or None, body bytes).
+        """
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0)
+        best, best_q = None, 0
+        for encoding in available_encodings():
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        if best is None:
+            return None, self.body
+        return best, self.encoded(best)
+
+    def matches(self, if_none_match: str) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
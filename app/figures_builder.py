@@ -1,30 +1,68 @@
 import pandas as pd
 import numpy as np
-import re
 import plotly.graph_objects as go
-import plotly.subplots as sp
-import matplotlib.pyplot as plt
 
+from app.quarter_stats import QuarterStats, cell_quarters
+from app.downsample import downsample
+from app.instrumentation import FIGURE_BUILD_SECONDS, PREPARE_DATA_SECONDS, observed
 
+
+QUARTER_PATTERN = r"^Q([1-4])\s+(\d{4})"
+# Line charts with more points than this switch to WebGL, per-point hover data
+# instead of hover strings, and downsampling to POINT_BUDGET points.
+LARGE_DATASET_POINTS = 20_000
+POINT_BUDGET = 20_000
+# matplotlib's tab20 colors, so the company palette needs no matplotlib import.
+TAB20 = (
+    "#1f77b4", "#aec7e8", "#ff7f0e", "#ffbb78", "#2ca02c", "#98df8a", "#d62728", "#ff9896", "#9467bd", "#c5b0d5",
+    "#8c564b", "#c49c94", "#e377c2", "#f7b6d2", "#7f7f7f", "#c7c7c7", "#bcbd22", "#dbdb8d", "#17becf", "#9edae5",
+)
+
+
+def parse_report_quarters(values: pd.Series) -> tuple:
+    """
+    Vectorized parsing of 'Q4 2023'-style labels.
+    Each distinct label is parsed once and the results are broadcast back through
+    the factorized codes, so the cost scales with the number of distinct quarters.
+    Returns (QuarterStart as datetime64[ns] array, normalized '2023Q4' labels).
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+
+    parts = pd.Series(uniques, dtype=object).astype(str).str.strip().str.extract(QUARTER_PATTERN)
+    valid = parts[0].notna().to_numpy()
+    quarter = parts[0].fillna(1).astype(np.int64).to_numpy()
+    year = parts[1].fillna(1970).astype(np.int64).to_numpy()
+
+    months = (year - 1970) * 12 + (quarter - 1) * 3
+    starts = months.astype("datetime64[M]").astype("datetime64[ns]")
+    starts[~valid] = np.datetime64("NaT")
+    labels = np.where(valid, year.astype(str).astype(object) + "Q" + quarter.astype(str).astype(object), "NaT")
+
+    # factorize maps missing values to -1; route them to an extra NaT/"NaT" slot.
+    starts = np.append(starts, np.datetime64("NaT", "ns"))
+    labels = np.append(labels, "NaT").astype(object)
+    return starts[codes], labels[codes]
+
+
+@observed(PREPARE_DATA_SECONDS)
 def prepare_data(df):
     df = df.copy()
 
-    def parse_quarter(qstr):
-        if pd.isna(qstr):
-            return pd.NaT
-        qstr = str(qstr).strip()
-        match = re.match(r"Q([1-4])\s+(\d{4})", qstr)
-        if match:
-            q = int(match.group(1))
-            year = int(match.group(2))
-            return pd.Period(year=year, quarter=q, freq="Q").to_timestamp(how="start")
-        return pd.NaT
+    quarter_start, report_quarter = parse_report_quarters(df["ReportQuarter"])
+    df["QuarterStart"] = quarter_start
+    df["ReportQuarter"] = report_quarter
 
-    df["QuarterStart"] = df["ReportQuarter"].apply(parse_quarter)
+    return df.sort_values(["Symbol", "QuarterStart"])
 
-    df["ReportQuarter"] = pd.to_datetime(df["QuarterStart"]).dt.to_period("Q").astype(str)
 
-    return df.sort_values(["Symbol", "QuarterStart"])
+def tab20_palette(n: int) -> list:
+    """
+    n hex colors from the tab20 colormap, picked the way matplotlib resamples it
+    (get_cmap("tab20", n)): n evenly spaced positions in [0, 1], each mapped to one
+    of the 20 colors, so more than 20 companies reuse colors in order.
+    """
+    positions = np.floor(np.linspace(0, 1, n) * len(TAB20)).astype(int)
+    return [TAB20[i] for i in np.minimum(positions, len(TAB20) - 1)]
 
 
 def generate_company_colors(df):
@@ -39,9 +77,7 @@ def generate_company_colors(df):
         .values
     )
 
-    n_colors = len(pairs)
-    cmap = plt.cm.get_cmap("tab20", n_colors)
-    palette = [plt.cm.colors.to_hex(cmap(i)) for i in range(n_colors)]
+    palette = tab20_palette(len(pairs))
 
     company_colors = {}
     for i, (symbol, name) in enumerate(pairs):
@@ -52,6 +88,84 @@ def generate_company_colors(df):
     return company_colors
 
 
+def debt_coverage(df: pd.DataFrame) -> pd.Series:
+    """
+    CCP/LTD ratio as float64; quarters with zero LTD get NaN.
+    """
+    ltd = df["LTD"].to_numpy(dtype=np.float64)
+    ccp = df["CCP"].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(ltd != 0, ccp / ltd, np.nan)
+    return pd.Series(ratio, index=df.index)
+
+
+def split_by(df: pd.DataFrame, key: str) -> tuple:
+    """
+    Orders df by (key, QuarterStart) in a single sort and returns the sorted frame
+    together with (name, slice) pairs, one per contiguous group.
+    Groups keep the order in which their key first appears in df, like df[key].unique().
+    """
+    codes, names = pd.factorize(df[key])
+    starts = df["QuarterStart"].to_numpy(dtype="datetime64[ns]")
+    # NaT sorts last, as in sort_values.
+    starts = np.where(np.isnat(starts), np.iinfo(np.int64).max, starts.view(np.int64))
+    order = np.lexsort((starts, codes))
+
+    ordered = df.iloc[order]
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+    edges = np.concatenate(([0], bounds, [len(ordered)]))
+
+    groups = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        code = sorted_codes[start]
+        if code < 0:
+            continue
+        groups.append((names[code], slice(int(start), int(stop))))
+    return ordered, groups
+
+
+def hover_labels(prefix: pd.Series, values: np.ndarray, fmt: str) -> np.ndarray:
+    """
+    Builds one hover string per row as prefix + fmt % value, over whole columns at once.
+    """
+    formatted = np.char.mod(fmt, np.asarray(values, dtype=np.float64))
+    return prefix.to_numpy(dtype=str).astype(object) + formatted.astype(object)
+
+
+def is_large(points: int, large: bool = None) -> bool:
+    return points > LARGE_DATASET_POINTS if large is None else large
+
+
+def time_values(x: pd.Series) -> np.ndarray:
+    """
+    Datetimes as float nanoseconds for LTTB, with NaT as NaN (a gap) rather than
+    the int64 minimum, which would sit at the far left of the axis.
+    """
+    values = x.to_numpy(dtype="datetime64[ns]")
+    return np.where(np.isnat(values), np.nan, values.astype(np.int64).astype(np.float64))
+
+
+def line_rows(x: np.ndarray, y: np.ndarray, rows: slice, threshold: int = None) -> np.ndarray:
+    """
+    Row positions of one line, reduced to about `threshold` points with LTTB when given.
+    """
+    positions = np.arange(rows.start, rows.stop)
+    if threshold is None:
+        return positions
+    return positions[downsample(x[positions], y[positions], threshold)]
+
+
+def points_per_line(total: int, lines: int, point_budget: int) -> int:
+    """
+    LTTB threshold per line so that all lines together stay within point_budget,
+    or None when they already do.
+    """
+    if not point_budget or total <= point_budget:
+        return None
+    return max(point_budget // max(lines, 1), 3)
+
+
 def add_annotation(
     fig: go.Figure,
     text: str,
@@ -97,114 +211,29 @@ def add_annotation(
     return fig
     
 
-def create_fig_1(df: pd.DataFrame, company_colors: dict) -> go.Figure:
-
-    quarters_sorted = sorted(df["QuarterStart"].dropna().unique())
-    quarter_labels = pd.to_datetime(quarters_sorted).to_period("Q").strftime("%Y-Q%q")
-
-    min_val = min(df["CCP"].min(), df["LTD"].min())
-    max_val = max(df["CCP"].max(), df["LTD"].max())
-    padding = (max_val - min_val) * 0.1
-    y_range = [min_val - padding, max_val + padding]
-
-    fig = sp.make_subplots(
-        specs=[[{"secondary_y": True}]],
-        figure=go.Figure(layout=dict(width=1100, height=700))
-    )
-
-    companies = df["Symbol"].unique()
-    n = len(companies)
-
-    for company in companies:
-        company_data = df[df["Symbol"] == company].sort_values("QuarterStart")
-        color = company_colors.get(company, "#000000")
-
-        hovertext_ccp = [
-            f"Company: {company}<br>Quarter: {label}<br>CCP: $ {val:.0f} M"
-            for label, val in zip(company_data["ReportQuarter"], company_data["CCP"])
-        ]
-
-        fig.add_trace(
-            go.Scatter(
-                x=company_data["QuarterStart"],
-                y=company_data["CCP"],
-                mode="lines",
-                name=company,
-                legendgroup=company,
-                line=dict(color=color, width=2),
-                hovertext=hovertext_ccp,
-                hovertemplate="%{hovertext}<extra></extra>",
-                showlegend=True
-            ),
-            secondary_y=False
-        )
-
-    for company in companies:
-        company_data = df[df["Symbol"] == company].sort_values("QuarterStart")
-        color = company_colors.get(company, "#000000")
-
-        hovertext_ltd = [
-            f"Company: {company}<br>Quarter: {label}<br>LTD: $ {val:.0f} M"
-            for label, val in zip(company_data["ReportQuarter"], company_data["LTD"])
-        ]
+def add_metric_menu(fig: go.Figure, n: int, metric: str):
+    """
+    Dropdown switching fig1 between CCP, LTD and both by toggling the visibility
+    of its 2 * n traces (the n CCP lines, then the n LTD lines).
+    """
+    views = {
+        "CCP": {"visible": [True] * n + [False] * n, "showlegend": [True] * n + [False] * n},
+        "LTD": {"visible": [False] * n + [True] * n, "showlegend": [False] * n + [True] * n},
+        "both": {"visible": [True] * n + [True] * n, "showlegend": [True] * n + [False] * n},
+    }
+    if metric != "both":
+        for trace, visible, showlegend in zip(fig.data, views[metric]["visible"], views[metric]["showlegend"]):
+            trace.visible = visible
+            trace.showlegend = showlegend
 
-        fig.add_trace(
-            go.Scatter(
-                x=company_data["QuarterStart"],
-                y=company_data["LTD"],
-                mode="lines",
-                name=company,
-                legendgroup=company,
-                line=dict(color=color, width=2, dash="dash"),
-                hovertext=hovertext_ltd,
-                hovertemplate="%{hovertext}<extra></extra>",
-                showlegend=True
-            ),
-            secondary_y=True
-        )
-        
-    for tr in fig.data:
-        if hasattr(tr, "line") and tr.line.dash == "dash":
-            tr.showlegend = False
-        
     fig.update_layout(
         updatemenus=[
             dict(
-                active=2,
+                active=list(views).index(metric),
                 buttons=[
-                    dict(
-                        label="CCP",
-                        method="update",
-                        args=[
-                            {
-                                "visible": [True] * n + [False] * n,
-                                "showlegend": [True] * n + [False] * n
-                            },
-                            {}
-                        ]
-                    ),
-                    dict(
-                        label="LTD",
-                        method="update",
-                        args=[
-                            {
-                                "visible": [False] * n + [True] * n,
-                                "showlegend": [False] * n + [True] * n
-                            },
-                            {}
-                        ]
-                    ),
-                    dict(
-                        label="CCP & LTD",
-                        method="update",
-                        args=[
-                            {
-                                "visible": [True] * n + [True] * n,
-                                "showlegend": [True] * n + [False] * n
-                            },
-                            {}
-                        ]
-                    ),
+                    dict(label="CCP", method="update", args=[views["CCP"], {}]),
+                    dict(label="LTD", method="update", args=[views["LTD"], {}]),
+                    dict(label="CCP & LTD", method="update", args=[views["both"], {}]),
                 ],
                 direction="down",
                 pad={"r": 10, "t": 10},
@@ -217,6 +246,101 @@ def create_fig_1(df: pd.DataFrame, company_colors: dict) -> go.Figure:
         ]
     )
 
+
+@observed(FIGURE_BUILD_SECONDS, figure="fig1")
+def create_fig_1(df: pd.DataFrame, company_colors: dict, large: bool = None,
+                 point_budget: int = POINT_BUDGET, metric: str = "both", menu: bool = True) -> go.Figure:
+    """
+    CCP (solid) and LTD (dashed) per company over time; `metric` ("CCP", "LTD" or
+    "both") picks the lines shown initially, as the figure's own dropdown does.
+    With menu=False the metric is chosen outside the figure (the dashboard's
+    controls): the dropdown is left out and only the chosen metric's lines are built.
+    In large-dataset mode (large=True, or automatically past LARGE_DATASET_POINTS)
+    lines are WebGL traces with hover built from customdata, downsampled to
+    point_budget points overall.
+    """
+
+    if metric not in ("CCP", "LTD", "both"):
+        raise ValueError(f"Unknown metric: {metric!r}")
+    lines = (("CCP", None, False), ("LTD", "dash", True))
+    if not menu and metric != "both":
+        lines = tuple(line for line in lines if line[0] == metric)
+    legend_column = lines[0][0]
+
+    quarters_sorted = sorted(df["QuarterStart"].dropna().unique())
+    quarter_labels = pd.to_datetime(quarters_sorted).to_period("Q").strftime("%Y-Q%q")
+
+    min_val = min(df["CCP"].min(), df["LTD"].min())
+    max_val = max(df["CCP"].max(), df["LTD"].max())
+    padding = (max_val - min_val) * 0.1
+    y_range = [min_val - padding, max_val + padding]
+
+    # plotly.subplots is only needed here, so importing this module does not load it.
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(
+        specs=[[{"secondary_y": True}]],
+        figure=go.Figure(layout=dict(width=1100, height=700))
+    )
+
+    ordered, groups = split_by(df, "Symbol")
+    n = len(groups)
+    x = ordered["QuarterStart"]
+
+    traces, secondary_ys = [], []
+    if is_large(len(lines) * len(ordered), large):
+        threshold = points_per_line(len(lines) * len(ordered), len(lines) * n, point_budget)
+        x_values = time_values(x)
+        quarters = ordered["ReportQuarter"].astype(str).to_numpy()
+        for column, dash, secondary_y in lines:
+            y = ordered[column].to_numpy(dtype=np.float64)
+            for company, rows in groups:
+                kept = line_rows(x_values, y, rows, threshold)
+                traces.append(
+                    go.Scattergl(
+                        x=x.iloc[kept],
+                        y=y[kept],
+                        customdata=quarters[kept],
+                        mode="lines",
+                        name=company,
+                        legendgroup=company,
+                        line=dict(color=company_colors.get(company, "#000000"), width=2, dash=dash),
+                        hovertemplate=f"Company: %{{fullData.name}}<br>Quarter: %{{customdata}}<br>{column}: $ %{{y:.0f}} M<extra></extra>",
+                        showlegend=column == legend_column
+                    )
+                )
+                secondary_ys.append(secondary_y)
+    else:
+        prefix = "Company: " + ordered["Symbol"].astype(str) + "<br>Quarter: " + ordered["ReportQuarter"].astype(str)
+        hovertext = {
+            "CCP": hover_labels(prefix + "<br>CCP: $ ", ordered["CCP"], "%.0f M"),
+            "LTD": hover_labels(prefix + "<br>LTD: $ ", ordered["LTD"], "%.0f M"),
+        }
+        for column, dash, secondary_y in lines:
+            y = ordered[column]
+            for company, rows in groups:
+                color = company_colors.get(company, "#000000")
+
+                traces.append(
+                    go.Scatter(
+                        x=x.iloc[rows],
+                        y=y.iloc[rows],
+                        mode="lines",
+                        name=company,
+                        legendgroup=company,
+                        line=dict(color=color, width=2, dash=dash),
+                        hovertext=hovertext[column][rows],
+                        hovertemplate="%{hovertext}<extra></extra>",
+                        showlegend=column == legend_column
+                    )
+                )
+                secondary_ys.append(secondary_y)
+
+    fig.add_traces(traces, rows=1, cols=1, secondary_ys=secondary_ys)
+
+    if menu:
+        add_metric_menu(fig, n, metric)
+
     fig.update_layout(
         title=dict(
             text="CCP and LTD by Company",
@@ -245,7 +369,8 @@ def create_fig_1(df: pd.DataFrame, company_colors: dict) -> go.Figure:
             "<b>Solid lines represent CCP</b>; <b>dashed lines represent LTD</b>.<br>"
             "Widening gaps signal improving liquidity, while convergence or "
             "crossovers highlight rising leverage pressure.<br>"
-            "Use the dropdown to explore CCP, LTD, or combined trends."
+            + ("Use the dropdown to explore CCP, LTD, or combined trends." if menu
+               else "Use the metric selector above to explore CCP, LTD, or combined trends.")
         ),
         position="top",
         y=1.10,
@@ -293,40 +418,70 @@ def create_fig_1(df: pd.DataFrame, company_colors: dict) -> go.Figure:
     return fig
 
 
-def create_fig_2(df: pd.DataFrame, company_colors: dict) -> go.Figure:
+@observed(FIGURE_BUILD_SECONDS, figure="fig2")
+def create_fig_2(df: pd.DataFrame, company_colors: dict, large: bool = None,
+                 point_budget: int = POINT_BUDGET) -> go.Figure:
     """
     CCP/LTD ratio trend by company.
     Uses consistent company_colors to ensure stable coloring across charts.
+    Large-dataset mode works as in create_fig_1.
     """
 
     data = df.copy()
-    data["DebtCoverage"] = data["CCP"] / data["LTD"].replace({0: pd.NA})
+    data["DebtCoverage"] = debt_coverage(data)
 
     fig = go.Figure()
-    companies = data["CompanyName"].unique()
 
     quarters_sorted = sorted(data["QuarterStart"].dropna().unique())
     quarter_labels = pd.to_datetime(quarters_sorted).to_period("Q").strftime("%Y-Q%q")
 
-    for company in companies:
-        company_data = data[data["CompanyName"] == company].sort_values("QuarterStart")
-        color = company_colors.get(company, "#000000")
-
-        fig.add_trace(
-            go.Scatter(
-                x=company_data["QuarterStart"],
-                y=company_data["DebtCoverage"],
-                mode="lines",
-                name=company,
-                line=dict(color=color, width=2),
-                marker=dict(color=color, size=6),
-                hovertext=[
-                    f"Company: {company}<br>Quarter: {q}<br>Debt Coverage: {val:.2f}"
-                    for q, val in zip(company_data["ReportQuarter"], company_data["DebtCoverage"])
-                ],
-                hovertemplate="%{hovertext}<extra></extra>"
+    ordered, groups = split_by(data, "CompanyName")
+
+    traces = []
+    if is_large(len(ordered), large):
+        threshold = points_per_line(len(ordered), len(groups), point_budget)
+        x = ordered["QuarterStart"]
+        x_values = time_values(x)
+        y = ordered["DebtCoverage"].to_numpy(dtype=np.float64)
+        quarters = ordered["ReportQuarter"].astype(str).to_numpy()
+        for company, rows in groups:
+            kept = line_rows(x_values, y, rows, threshold)
+            traces.append(
+                go.Scattergl(
+                    x=x.iloc[kept],
+                    y=y[kept],
+                    customdata=quarters[kept],
+                    mode="lines",
+                    name=company,
+                    line=dict(color=company_colors.get(company, "#000000"), width=2),
+                    hovertemplate="Company: %{fullData.name}<br>Quarter: %{customdata}<br>Debt Coverage: %{y:.2f}<extra></extra>"
+                )
             )
+    else:
+        hovertext = hover_labels(
+            "Company: " + ordered["CompanyName"].astype(str)
+            + "<br>Quarter: " + ordered["ReportQuarter"].astype(str)
+            + "<br>Debt Coverage: ",
+            ordered["DebtCoverage"],
+            "%.2f"
         )
+        for company, rows in groups:
+            company_data = ordered.iloc[rows]
+            color = company_colors.get(company, "#000000")
+
+            traces.append(
+                go.Scatter(
+                    x=company_data["QuarterStart"],
+                    y=company_data["DebtCoverage"],
+                    mode="lines",
+                    name=company,
+                    line=dict(color=color, width=2),
+                    marker=dict(color=color, size=6),
+                    hovertext=hovertext[rows],
+                    hovertemplate="%{hovertext}<extra></extra>"
+                )
+            )
+    fig.add_traces(traces)
 
     max_ratio = max(data["DebtCoverage"].max(), 1.2)
 
@@ -394,24 +549,24 @@ def create_fig_2(df: pd.DataFrame, company_colors: dict) -> go.Figure:
     return fig
 
 
-def create_fig_3(df: pd.DataFrame) -> go.Figure:
+def quarter_axis_labels(ordinals) -> list:
     """
-    Financial Resilience Heatmap (CCP/LTD Ratio per company over time).
+    '2023-Q4' axis labels for quarter ordinals (year * 4 + quarter - 1).
     """
+    return [f"{q // 4}-Q{q % 4 + 1}" for q in ordinals]
 
-    data = df.copy()
-
-    data["DebtCoverage"] = data["CCP"] / data["LTD"].replace({0: pd.NA})
 
-    pivot = data.pivot_table(
-        index="CompanyName",
-        columns="ReportQuarter",
-        values="DebtCoverage",
-        aggfunc="first"
-    ).sort_index()
+@observed(FIGURE_BUILD_SECONDS, figure="fig3")
+def create_fig_3(df: pd.DataFrame, stats: QuarterStats = None) -> go.Figure:
+    """
+    Financial Resilience Heatmap (CCP/LTD Ratio per company over time).
+    The company x quarter matrix comes from the aggregate layer (built from df
+    when no stats are given).
+    """
 
-    quarters_sorted = sorted(data["ReportQuarter"].dropna().unique())
-    quarter_labels = pd.to_datetime(quarters_sorted).to_period("Q").strftime("%Y-Q%q")
+    stats = stats if stats is not None else QuarterStats.from_frame(df)
+    pivot = stats.coverage
+    quarter_labels = quarter_axis_labels(pivot.columns)
 
     colorscale = [
         [0.0, "#F28E8C"],
@@ -430,7 +585,7 @@ def create_fig_3(df: pd.DataFrame) -> go.Figure:
             y=pivot.index,
             colorscale=colorscale,
             zmin=0,
-            zmax=np.nanmax(pivot.values),
+            zmax=stats.max_coverage(),
             xgap=2,
             ygap=3,
             colorbar=dict(
@@ -488,164 +643,162 @@ def create_fig_3(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_fig_4(df: pd.DataFrame, company_colors: dict) -> go.Figure:
+def scale_sizes(values: pd.Series, min_size: float = 10, max_size: float = 50) -> pd.Series:
+    """
+    Min-max scales values into [min_size, max_size] bubble sizes.
+    A constant series maps to the middle of the range.
+    """
+    lo, hi = values.min(), values.max()
+    if hi == lo:
+        return pd.Series((min_size + max_size) / 2, index=values.index)
+    return min_size + (values - lo) * (max_size - min_size) / (hi - lo)
+
+
+def bubble_trace(points: pd.DataFrame, sizes: pd.Series, company_colors: dict, name: str, hovertext) -> dict:
+    """
+    One marker trace holding a bubble per row of points, colored per company.
+    A plain dict of arrays, added to the figure without plotly's per-point validation.
+    """
+    # Fixed-width string arrays: the figure deep-copies its data, and copying these is a
+    # memcpy where a list or object array copies every element.
+    colors = np.array([company_colors.get(company, "#000000") for company in points["CompanyName"]])
+    return dict(
+        type="scatter",
+        x=points["CCP"].to_numpy(),
+        y=points["LTD"].to_numpy(),
+        mode="markers+text",
+        marker=dict(
+            color=colors,
+            size=sizes.loc[points.index].to_numpy(),
+            sizemode="area",
+            line=dict(width=1, color="black")
+        ),
+        text=points["Symbol"].to_numpy(dtype=str),
+        textfont=dict(color=colors),
+        textposition="top center",
+        name=name,
+        showlegend=False,
+        visible=False,
+        hovertext=np.asarray(hovertext, dtype=str),
+        hovertemplate="%{hovertext}<extra></extra>"
+    )
+
+
+def median_lines(points: pd.DataFrame, median_ccp: float, median_ltd: float, name: str) -> list:
+    """
+    Red vertical (median CCP) and blue horizontal (median LTD) reference lines.
+    """
+    return [
+        dict(
+            type="scatter",
+            x=[median_ccp, median_ccp],
+            y=[0, points["LTD"].max() * 1.1],
+            mode="lines",
+            line=dict(color="red", dash="dash"),
+            name=f"{name} Median CCP",
+            visible=False,
+            showlegend=False
+        ),
+        dict(
+            type="scatter",
+            x=[0, points["CCP"].max() * 1.1],
+            y=[median_ltd, median_ltd],
+            mode="lines",
+            line=dict(color="blue", dash="dash"),
+            name=f"{name} Median LTD",
+            visible=False,
+            showlegend=False
+        ),
+    ]
+
+
+def with_traces(fig: go.Figure, traces: list) -> go.Figure:
+    """
+    fig, whose layout is built and validated as usual, with traces added as they are.
+    The traces are built from clean arrays; validating every point's color, size
+    and text would dominate the build time on large datasets.
+    """
+    return go.Figure(data=traces, layout=fig.layout, _validate=False)
+
+
+@observed(FIGURE_BUILD_SECONDS, figure="fig4")
+def create_fig_4(df: pd.DataFrame, company_colors: dict, stats: QuarterStats = None) -> go.Figure:
     """
     Debt vs Liquid Assets (Bubble chart per quarter + median comparison)
+    Each quarter is a single bubble trace plus its two median lines, so the figure
+    grows with the number of rows rather than with companies x quarters.
+    Medians come from the aggregate layer (built from df when no stats are given).
     """
 
+    stats = stats if stats is not None else QuarterStats.from_frame(df)
+
     result_df = df.copy()
-    result_df["DebtCoverage"] = result_df["CCP"] / result_df["LTD"].replace({0: pd.NA})
+    result_df["DebtCoverage"] = debt_coverage(result_df)
 
     latest = (
         result_df.sort_values("QuarterStart")
                  .groupby(["CompanyName", "ReportQuarter"])
                  .tail(1)
+                 .sort_values(["CompanyName", "QuarterStart"])
     )
 
-    quarters_sorted = sorted(result_df["QuarterStart"].dropna().unique())
-    quarter_labels = pd.to_datetime(quarters_sorted).to_period("Q").strftime("%Y-Q%q")
-    companies = sorted(latest["CompanyName"].unique())
-
-    min_size, max_size = 10, 50
-    sizes = latest["DebtCoverage"]
-    scaled_sizes = min_size + (sizes - sizes.min()) * (max_size - min_size) / (sizes.max() - sizes.min())
+    quarter_labels = quarter_axis_labels(stats.quarters)
 
-    fig = go.Figure()
+    scaled_sizes = scale_sizes(latest["DebtCoverage"])
 
-    for company in companies:
-        for quarter, q_label in zip(quarters_sorted, quarter_labels):
-            subset = latest[(latest["CompanyName"] == company) & (latest["QuarterStart"] == quarter)]
-            if subset.empty:
-                continue
+    hovertext = (
+        "Company: " + latest["CompanyName"].astype(str)
+        + "<br>Quarter: " + latest["ReportQuarter"].astype(str)
+        + "<br>CCP: " + np.char.mod("%.0f", latest["CCP"].to_numpy(dtype=np.float64)).astype(object)
+        + "<br>LTD: " + np.char.mod("%.0f", latest["LTD"].to_numpy(dtype=np.float64)).astype(object)
+        + "<br>CCP/LTD: " + np.char.mod("%.2f", latest["DebtCoverage"].to_numpy(dtype=np.float64)).astype(object)
+    )
 
-            size = scaled_sizes.loc[subset.index[0]]
-            color = company_colors.get(company, "#000000")
+    by_quarter = dict(iter(latest.groupby(cell_quarters(latest["QuarterStart"]), sort=False)))
 
-            fig.add_trace(
-                go.Scatter(
-                    x=subset["CCP"],
-                    y=subset["LTD"],
-                    mode="markers+text",
-                    marker=dict(
-                        color=color,
-                        size=size,
-                        sizemode="area",
-                        line=dict(width=1, color="black")
-                    ),
-                    text=subset["Symbol"],
-                    textfont=dict(color=color),
-                    textposition="top center",
-                    name=f"{company} - {q_label}",
-                    legendgroup=company,
-                    showlegend=True,
-                    visible=False,
-                    hovertext=[
-                        f"Company: {company}<br>"
-                        f"Quarter: {subset['ReportQuarter'].iloc[0]}<br>"
-                        f"CCP: {subset['CCP'].iloc[0]:.0f}<br>"
-                        f"LTD: {subset['LTD'].iloc[0]:.0f}<br>"
-                        f"CCP/LTD: {subset['DebtCoverage'].iloc[0]:.2f}"
-                    ],
-                    hovertemplate="%{hovertext}<extra></extra>"
-                )
-            )
-
-    for quarter, q_label in zip(quarters_sorted, quarter_labels):
-        subset = latest[latest["QuarterStart"] == quarter]
-        if subset.empty:
+    traces = []
+    quarter_traces = {}
+    for quarter, q_label in zip(stats.quarters, quarter_labels):
+        subset = by_quarter.get(quarter)
+        if subset is None:
             continue
 
-        median_ccp = subset["CCP"].median()
-        median_ltd = subset["LTD"].median()
+        q_stats = stats.quarter(quarter)
+        quarter_traces[q_label] = range(len(traces), len(traces) + 3)
+        traces.append(bubble_trace(subset, scaled_sizes, company_colors, q_label, hovertext.loc[subset.index]))
+        traces.extend(median_lines(subset, q_stats.median("CCP"), q_stats.median("LTD"), f"Quarter {q_label}"))
 
-        fig.add_trace(go.Scatter(
-            x=[median_ccp, median_ccp],
-            y=[0, subset["LTD"].max() * 1.1],
-            mode="lines",
-            line=dict(color="red", dash="dash"),
-            name=f"Quarter Median CCP - {q_label}",
-            visible=False,
-            showlegend=False
-        ))
-        fig.add_trace(go.Scatter(
-            x=[0, subset["CCP"].max() * 1.1],
-            y=[median_ltd, median_ltd],
-            mode="lines",
-            line=dict(color="blue", dash="dash"),
-            name=f"Quarter Median LTD - {q_label}",
-            visible=False,
-            showlegend=False
-        ))
+    median_all = stats.company_medians()
 
-    median_all = latest.groupby("CompanyName").agg(
-        CCP=("CCP", "median"),
-        LTD=("LTD", "median"),
-        DebtCoverage=("DebtCoverage", "median"),
-        Symbol=("Symbol", "first")
-    ).reset_index()
+    median_hovertext = (
+        "Company: " + median_all["CompanyName"].astype(str)
+        + "<br>Median CCP: " + np.char.mod("%.0f", median_all["CCP"].to_numpy(dtype=np.float64)).astype(object)
+        + "<br>Median LTD: " + np.char.mod("%.0f", median_all["LTD"].to_numpy(dtype=np.float64)).astype(object)
+        + "<br>Median CCP/LTD: " + np.char.mod("%.2f", median_all["DebtCoverage"].to_numpy(dtype=np.float64)).astype(object)
+    )
 
-    sizes_median = median_all["DebtCoverage"]
-    if sizes_median.max() == sizes_median.min():
-        scaled_median_sizes = pd.Series((min_size + max_size) / 2, index=sizes_median.index)
-    else:
-        scaled_median_sizes = min_size + (sizes_median - sizes_median.min()) * (max_size - min_size) / (sizes_median.max() - sizes_median.min())
-
-    for idx, row in median_all.iterrows():
-        company = row["CompanyName"]
-        color = company_colors.get(company, "#000000")
-        size = scaled_median_sizes.loc[idx]
-
-        fig.add_trace(
-            go.Scatter(
-                x=[row["CCP"]],
-                y=[row["LTD"]],
-                mode="markers+text",
-                marker=dict(
-                    color=color,
-                    size=size,
-                    sizemode="area",
-                    line=dict(width=1, color="black")
-                ),
-                text=row["Symbol"],
-                textfont=dict(color=color),
-                textposition="top center",
-                name=f"{company} - Median",
-                legendgroup=company,
-                showlegend=True,
-                visible=False
-            )
-        )
+    median_traces = range(len(traces), len(traces) + 3)
+    traces.append(bubble_trace(median_all, scale_sizes(median_all["DebtCoverage"]), company_colors, "Median", median_hovertext))
+    traces.extend(median_lines(latest, stats.overall.median("CCP"), stats.overall.median("LTD"), "Global"))
 
-    median_ccp = latest["CCP"].median(skipna=True)
-    median_ltd = latest["LTD"].median(skipna=True)
+    for index in median_traces:
+        traces[index]["visible"] = True
 
-    fig.add_trace(go.Scatter(
-        x=[median_ccp, median_ccp],
-        y=[0, latest["LTD"].max() * 1.1],
-        mode="lines",
-        line=dict(color="red", dash="dash"),
-        name="Global Median CCP",
-        visible=False,
-        showlegend=False
-    ))
-    fig.add_trace(go.Scatter(
-        x=[0, latest["CCP"].max() * 1.1],
-        y=[median_ltd, median_ltd],
-        mode="lines",
-        line=dict(color="blue", dash="dash"),
-        name="Global Median LTD",
-        visible=False,
-        showlegend=False
-    ))
+    fig = go.Figure()
+
+    def visibility(indices) -> list:
+        visible = [False] * len(traces)
+        for index in indices:
+            visible[index] = True
+        return visible
 
     quarter_buttons = []
     for q_label in quarter_labels:
-        visible = [(q_label in tr.name) for tr in fig.data]
         quarter_buttons.append(dict(
             label=q_label,
             method="update",
             args=[
-                {"visible": visible},
+                {"visible": visibility(quarter_traces.get(q_label, ()))},
                 {"title.text": f"Debt vs Liquid Assets: {q_label}"}
             ]
         ))
@@ -654,8 +807,7 @@ def create_fig_4(df: pd.DataFrame, company_colors: dict) -> go.Figure:
         label="All Quarters (Median)",
         method="update",
         args=[
-            {"visible": [("Global Median" in tr.name) or ("- Median" in tr.name)
-                        for tr in fig.data]},
+            {"visible": visibility(median_traces)},
             {"title.text": "Debt vs Liquid Assets: Median Across Quarters"}
         ]
     ))
@@ -673,8 +825,7 @@ def create_fig_4(df: pd.DataFrame, company_colors: dict) -> go.Figure:
         yaxis_title="Long-Term Debt (LTD)",
         width=1100, height=700,
         plot_bgcolor="white",
-        showlegend=True,
-        legend_title="Companies (click to show/hide)<br>",
+        showlegend=False,
         updatemenus=[dict(
             buttons=quarter_buttons,
             active=0,
@@ -694,7 +845,8 @@ def create_fig_4(df: pd.DataFrame, company_colors: dict) -> go.Figure:
             "Bubble size reflects the <b>CCP/LTD ratio</b>.<br>"
             "<b>Blue dashed line = median LTD</b>, <b>Red dashed line = median CCP</b> "
             "(recalculated dynamically for each selected period).<br>"
-            "Used to identify companies positioned above or below peer benchmarks."
+            "Used to identify companies positioned above or below peer benchmarks.<br>"
+            "Companies share one trace per quarter: show or hide them with the company filter."
         ),
         position="top",
         y=1.10,
@@ -708,7 +860,4 @@ def create_fig_4(df: pd.DataFrame, company_colors: dict) -> go.Figure:
     fig.update_yaxes(showline=True, linewidth=1, linecolor="black", mirror=True,
                      showgrid=True, gridcolor="lightgray")
 
-    for tr in fig.data:
-        tr.visible = ("Global Median" in tr.name) or ("- Median" in tr.name)
-
-    return fig
+    return with_traces(fig, traces)
@@ -0,0 +1,245 @@
+import functools
+import os
+import resource
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+# Prometheus' default buckets, extended for figure builds on large datasets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_disabled = nullcontext()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Metric(ABC):
+    kind = None
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> list:
+        ...
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in values]
+
+
+class Histogram(Metric):
+    """
+    Cumulative-bucket histogram of durations in seconds, one series per label set.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        samples = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, f'le="{le}"'), cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(self.labelnames, key), total))
+            samples.append((f"{self.name}_count", _format_labels(self.labelnames, key), cumulative))
+        return samples
+
+
+class Gauge(Metric):
+    """
+    Value read from a function at scrape time, so nothing is updated on the hot path.
+    The function returns a number, or None to omit the sample.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read):
+        super().__init__(name, help)
+        self.read = read
+
+    def samples(self) -> list:
+        value = self.read()
+        return [] if value is None else [(self.name, "", value)]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+def resident_memory_bytes():
+    """
+    Current RSS from /proc on Linux; elsewhere the peak RSS reported by getrusage.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def timed(histogram: Histogram, **labels):
+    """
+    Context manager that records its duration in the histogram; a shared no-op when
+    metrics are disabled.
+    """
+    return histogram.time(**labels) if METRICS_ENABLED else _disabled
+
+
+def observed(histogram: Histogram, **labels):
+    """
+    Decorator that records every call's duration in the histogram. With metrics
+    disabled the function is returned unchanged, so it costs nothing.
+    """
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+registry = Registry()
+
+DATA_LOAD_SECONDS = registry.register(Histogram(
+    "dashboard_data_load_seconds", "Time to load and prepare the dataset from its source.", ("source",)
+))
+PREPARE_DATA_SECONDS = registry.register(Histogram(
+    "dashboard_prepare_data_seconds", "Time spent in prepare_data."
+))
+FIGURE_BUILD_SECONDS = registry.register(Histogram(
+    "dashboard_figure_build_seconds", "Time spent in each create_fig_* builder.", ("figure",)
+))
+FIGURE_SERIALIZE_SECONDS = registry.register(Histogram(
+    "dashboard_figure_serialize_seconds", "Time to serialize a figure to JSON bytes.", ("figure",)
+))
+RENDER_TAB_SECONDS = registry.register(Histogram(
+    "dashboard_render_tab_seconds", "Time spent in the Dash render_tab callback.", ("tab",)
+))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "dashboard_http_request_duration_seconds", "API request latency by route.", ("method", "route", "status")
+))
+HTTP_REQUESTS = registry.register(Counter(
+    "dashboard_http_requests_total", "API requests by route and status.", ("method", "route", "status")
+))
+registry.register(Gauge(
+    "process_resident_memory_bytes", "Resident memory of this process.", resident_memory_bytes
+))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and count of every HTTP request, labelled
+    with the matched route template (e.g. /metrics/{company}) so series stay bounded.
+    Requests served by a mounted app (the Dash dashboard) are labelled with their
+    first path segment, and 404s without a route as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            if not route:
+                route = "unmatched" if status[0] == 404 else "/" + scope["path"].lstrip("/").split("/", 1)[0]
+            labels = {"method": scope["method"], "route": route, "status": str(status[0])}
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, **labels)
+            HTTP_REQUESTS.inc(**labels)
@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+# Fields the dashboard and API actually read; parsing artifacts such as
+# TextListLen, TableIndex or FormURL are left in MongoDB.
+DASHBOARD_FIELDS = ("Symbol", "CompanyName", "ReportQuarter", "CCP", "LTD")
+NUMERIC_FIELDS = ("CCP", "LTD")
+BATCH_SIZE = 10_000
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(uri: str, max_pool_size: int = 10):
+    """
+    Process-wide MongoClient, created on first use and reused afterwards.
+    pymongo is imported here so JSON-only deployments never load it.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from pymongo import MongoClient
+            _client = MongoClient(uri, maxPoolSize=max_pool_size)
+        return _client
+
+
+def get_async_client(uri: str, max_pool_size: int = 10):
+    """
+    Process-wide motor client, or None when motor is not installed.
+    """
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            try:
+                from motor.motor_asyncio import AsyncIOMotorClient
+            except ImportError:
+                return None
+            _async_client = AsyncIOMotorClient(uri, maxPoolSize=max_pool_size)
+        return _async_client
+
+
+def close_client():
+    global _client, _async_client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        if _async_client is not None:
+            _async_client.close()
+            _async_client = None
+
+
+def to_float(value) -> float:
+    """
+    A numeric field's value as a float, NaN when it cannot be read as a number.
+    Strings may use thousands separators ("1,234"); BSON Decimal128 is supported.
+    """
+    if isinstance(value, str):
+        value = value.replace(",", "").strip()
+    elif hasattr(value, "to_decimal"):
+        value = value.to_decimal()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ColumnBuffer:
+    """
+    Preallocated column arrays filled one document at a time. Numeric fields are
+    float64 (NaN when missing or not a number), everything else an object array.
+    The arrays grow when more documents arrive than the initial capacity.
+    """
+
+    def __init__(self, fields, capacity: int):
+        self.fields = list(fields)
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.columns = {name: self._allocate(name, self.capacity) for name in self.fields}
+
+    @staticmethod
+    def _allocate(name: str, capacity: int) -> np.ndarray:
+        return np.full(capacity, np.nan) if name in NUMERIC_FIELDS else np.empty(capacity, dtype=object)
+
+    def append(self, doc: dict):
+        if self.size == self.capacity:
+            # The capacity is an estimate: grow geometrically.
+            self.capacity *= 2
+            for name, values in self.columns.items():
+                grown = self._allocate(name, self.capacity)
+                grown[:self.size] = values[:self.size]
+                self.columns[name] = grown
+        for name in self.fields:
+            value = doc.get(name)
+            if value is not None:
+                self.columns[name][self.size] = to_float(value) if name in NUMERIC_FIELDS else value
+        self.size += 1
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: values[:self.size] for name, values in self.columns.items()})
+
+
+def projection(fields) -> dict:
+    """
+    Find projection for fields; _id is excluded unless requested.
+    """
+    spec = {name: 1 for name in fields}
+    if "_id" not in spec:
+        spec["_id"] = 0
+    return spec
+
+
+def initial_capacity(collection, query: dict, batch_size: int) -> int:
+    """
+    Buffer size to start from. An unfiltered load uses the collection's metadata
+    count instead of counting documents; a filtered one starts at one batch.
+    """
+    return collection.estimated_document_count() if not query else batch_size
+
+
+def load_collection(collection, fields=DASHBOARD_FIELDS, query: dict = None, batch_size: int = BATCH_SIZE) -> pd.DataFrame:
+    """
+    Streams the projected fields of every matching document into preallocated
+    column arrays and builds the DataFrame from them, without materializing
+    the documents as a list of dicts.
+
+    `collection` is anything with the pymongo Collection API (e.g. mongomock).
+    Include "_id" in fields to keep document ids.
+    """
+    query = query or {}
+    buffer = ColumnBuffer(fields, initial_capacity(collection, query, batch_size))
+    for doc in collection.find(query, projection(fields)).batch_size(batch_size):
+        buffer.append(doc)
+    return buffer.frame()
+
+
+async def load_collection_async(collection, fields=DASHBOARD_FIELDS, query: dict = None, batch_size: int = BATCH_SIZE) -> pd.DataFrame:
+    """
+    load_collection for an async (motor) collection.
+    """
+    query = query or {}
+    capacity = await collection.estimated_document_count() if not query else batch_size
+    buffer = ColumnBuffer(fields, capacity)
+    async for doc in collection.find(query, projection(fields)).batch_size(batch_size):
+        buffer.append(doc)
+    return buffer.frame()
+
+
+def latest_id(collection):
+    """
+    Highest _id in the collection (None when empty). ObjectIds grow with insertion
+    time, so this serves as a high-water mark for picking up new documents.
+    """
+    doc = collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    return doc["_id"] if doc else None
+
+
+async def latest_id_async(collection):
+    doc = await collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    return doc["_id"] if doc else None
@@ -0,0 +1,94 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+from app.arrow_io import _pyarrow
+
+
+# Bump when prepare_data changes its output, so old cache files are not reused.
+PREPARED_FORMAT_VERSION = 2
+# Schema metadata key holding the dataset's content version (DataStore.version).
+VERSION_KEY = b"dashboard_version"
+
+
+def source_key(path: str) -> str:
+    """
+    Identifies one state of a source file by its resolved path, size and mtime.
+    """
+    stat = os.stat(path)
+    raw = f"{os.path.realpath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{PREPARED_FORMAT_VERSION}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def cache_path(source: str, cache_dir: str) -> str:
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir, f"{stem}-{source_key(source)}.arrow")
+
+
+def read_prepared(path: str) -> tuple:
+    """
+    Memory-maps an Arrow IPC file. Returns (frame, version written with it or None).
+    Numeric columns without missing values stay backed by the mapped pages, which
+    the OS shares between every process that maps the same file.
+    """
+    pa = _pyarrow()
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    version = (table.schema.metadata or {}).get(VERSION_KEY)
+    return table.to_pandas(split_blocks=True), version.decode() if version else None
+
+
+def write_prepared(df: pd.DataFrame, path: str, version: str = None):
+    """
+    Writes df as an uncompressed Arrow IPC file (so it can be memory-mapped),
+    via a temporary file and an atomic rename. `version` is stored in the schema
+    metadata, so readers can skip hashing the dataset again.
+    """
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if version:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), VERSION_KEY: version.encode()})
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def load_prepared(source: str, build, cache_dir: str) -> tuple:
+    """
+    Returns (prepared frame, version) for source, from the cache when it matches the
+    current state of the file, otherwise by calling build() (which returns the same
+    pair) and caching the result.
+    Unwritable cache directories degrade to build() alone.
+    Cache files left behind by older versions of the source are removed.
+    Falls back to build() alone when pyarrow is unavailable.
+    """
+    try:
+        _pyarrow()
+    except ImportError:
+        return build()
+
+    path = cache_path(source, cache_dir)
+    if os.path.exists(path):
+        return read_prepared(path)
+
+    df, version = build()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_prepared(df, path, version)
+    except OSError as e:
+        print(f"Prepared-data cache not written ({e}); continuing without it")
+        return df, version
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    for stale in glob.glob(os.path.join(cache_dir, f"{stem}-*.arrow")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    # Re-read the file so cold and warm starts see identical frames (and versions).
+    return read_prepared(path)
@@ -0,0 +1,280 @@
+import contextvars
+import cProfile
+import itertools
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+# off: no profiling; header: only requests sending PROFILE_HEADER; on: every request.
+PROFILING = os.getenv("PROFILING", "off").lower()
+# cprofile: deterministic, saved as .pstats; sampling: stack samples, saved as speedscope JSON.
+PROFILER = os.getenv("PROFILER", "cprofile").lower()
+PROFILE_THRESHOLD_MS = float(os.getenv("PROFILE_THRESHOLD_MS", "500"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "..", "data", ".profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+PROFILE_HEADER = "X-Profile"
+PROFILE_FILE = re.compile(r"^[\w.-]+\.(pstats|speedscope\.json)$")
+
+_current = contextvars.ContextVar("request_profile", default=None)
+_sequence = itertools.count()
+# One request uses cProfile at a time. From Python 3.12 enabling a second profiler
+# raises ValueError, and an active one records every thread, so requests arriving
+# while another is being profiled with cProfile fall back to the sampling profiler.
+_cprofile_slot = threading.Lock()
+
+
+def requested(header_value) -> bool:
+    """
+    Whether a request should be profiled, given the value of its PROFILE_HEADER.
+    """
+    if PROFILING == "on":
+        return True
+    return PROFILING == "header" and str(header_value or "").lower() in ("1", "true", "yes")
+
+
+class RequestProfile:
+    """
+    Profile of one request, collected on every thread that works on it: the thread
+    running the callback and the pool threads its blocking calls are offloaded to.
+
+    With PROFILER=cprofile each thread gets its own cProfile.Profile and the results
+    are merged into one pstats file. With PROFILER=sampling, or when another request
+    holds the cProfile slot, a background thread records the stacks of the
+    participating threads every SAMPLE_INTERVAL seconds.
+    """
+
+    def __init__(self, name: str, kind: str = PROFILER):
+        self.name = name
+        self.kind = kind
+        self.profiles = []
+        self.samples = []
+        self.threads = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._holds_slot = False
+
+    @contextmanager
+    def collect(self):
+        """
+        Profiles the current thread for the duration of the block.
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            nested = ident in self.threads
+            self.threads.add(ident)
+        if nested:
+            yield
+            return
+
+        profile = cProfile.Profile() if self.kind == "cprofile" else None
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is active: on Python 3.12+ the one enabled for this
+                # request's first thread already records this one; otherwise it was
+                # started outside the app, and this thread goes unprofiled.
+                profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self.threads.discard(ident)
+                if profile is not None:
+                    self.profiles.append(profile)
+
+    def start(self):
+        if self.kind == "cprofile":
+            self._holds_slot = _cprofile_slot.acquire(blocking=False)
+            if not self._holds_slot:
+                self.kind = "sampling"
+        if self.kind == "sampling":
+            self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        if self._holds_slot:
+            self._holds_slot = False
+            _cprofile_slot.release()
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = list(self.threads)
+            for ident in threads:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                if stack:
+                    self.samples.append(stack[::-1])
+
+    def empty(self) -> bool:
+        return not (self.profiles or self.samples)
+
+    def save(self, directory: str, duration: float) -> str:
+        """
+        Writes the profile to directory and returns the file name.
+        """
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^\w-]+", "_", self.name).strip("_")[:60]
+        stem = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_sequence)}-{int(duration * 1000)}ms-{slug}"
+        if self.kind == "cprofile":
+            filename = f"{stem}.pstats"
+            stats = pstats.Stats(self.profiles[0])
+            for profile in self.profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(os.path.join(directory, filename))
+        else:
+            filename = f"{stem}.speedscope.json"
+            with open(os.path.join(directory, filename), "w") as f:
+                json.dump(self.speedscope(duration), f)
+        prune(directory, PROFILE_KEEP)
+        return filename
+
+    def speedscope(self, duration: float) -> dict:
+        frames, index = [], {}
+        samples = []
+        for stack in self.samples:
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                sample.append(index[frame])
+            samples.append(sample)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": duration,
+                "samples": samples,
+                "weights": [SAMPLE_INTERVAL] * len(samples),
+            }],
+            "name": self.name,
+            "exporter": "financial-dashboard",
+        }
+
+
+def prune(directory: str, keep: int):
+    """
+    Deletes all but the newest `keep` profiles.
+    """
+    files = sorted(list_profiles(directory), key=lambda p: p["created"])
+    for profile in files[:max(0, len(files) - keep)]:
+        try:
+            os.remove(os.path.join(directory, profile["name"]))
+        except OSError:
+            pass
+
+
+def list_profiles(directory: str = PROFILE_DIR) -> list:
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if PROFILE_FILE.match(name):
+            stat = os.stat(os.path.join(directory, name))
+            profiles.append({"name": name, "bytes": stat.st_size, "created": stat.st_mtime})
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+
+def profile_path(name: str, directory: str = PROFILE_DIR) -> str:
+    """
+    Path of a saved profile. Raises FileNotFoundError for unknown or malformed names.
+    """
+    path = os.path.join(directory, name)
+    if not PROFILE_FILE.match(name) or not os.path.isfile(path):
+        raise FileNotFoundError(name)
+    return path
+
+
+@contextmanager
+def _profile_request(name: str, collect: bool):
+    profile = RequestProfile(name)
+    token = _current.set(profile)
+    profile.start()
+    start = time.perf_counter()
+    try:
+        if collect:
+            with profile.collect():
+                yield profile
+        else:
+            yield profile
+    finally:
+        duration = time.perf_counter() - start
+        profile.stop()
+        _current.reset(token)
+        if not profile.empty() and duration * 1000 >= PROFILE_THRESHOLD_MS:
+            try:
+                filename = profile.save(PROFILE_DIR, duration)
+                print(f"Saved profile of {name} ({duration * 1000:.0f} ms) to {filename}")
+            except (OSError, ValueError) as e:
+                print(f"Profile of {name} not saved: {e!r}")
+
+
+def profile_request(name: str, header_value=None, collect: bool = True):
+    """
+    Context manager profiling a request when profiling is enabled for it.
+    With collect=False only offloaded calls (see `profiled`) are profiled, not the
+    current thread; used for async handlers whose event loop serves other requests too.
+    """
+    if not requested(header_value) or _current.get() is not None:
+        return nullcontext()
+    return _profile_request(name, collect)
+
+
+def profiled(func):
+    """
+    func, wrapped to be profiled as part of the current request's profile when it
+    is run on another thread. Without an active profile func is returned unchanged.
+    """
+    profile = _current.get()
+    if profile is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        with profile.collect():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling API requests. The handlers' blocking work runs on the
+    API pool through run_blocking, which attaches it to the request's profile.
+    Paths under skip_prefixes (a mounted app that profiles itself) are passed
+    through, so they do not hold the cProfile slot with an empty profile.
+    """
+
+    def __init__(self, app, skip_prefixes: tuple = ()):
+        self.app = app
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+        header = dict(scope["headers"]).get(PROFILE_HEADER.lower().encode(), b"").decode("latin-1")
+        with profile_request(f"{scope['method']} {scope['path']}", header, collect=False):
+            await self.app(scope, receive, send)
@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+
+
+METRICS = ("CCP", "LTD", "DebtCoverage")
+
+
+def cell_quarters(starts) -> np.ndarray:
+    """
+    Quarter ordinals (year * 4 + quarter - 1) of QuarterStart values; -1 for NaT.
+    """
+    starts = pd.to_datetime(pd.Series(starts))
+    ordinals = starts.dt.year * 4 + (starts.dt.month - 1) // 3
+    return ordinals.fillna(-1).to_numpy(dtype=np.int64)
+
+
+class OrderStats:
+    """
+    Sorted values of each metric for one group (a quarter, a company or everything),
+    so counts, medians and maxima are read off by position. NaN values are left out.
+
+    The values are NumPy arrays that are never modified in place: `updated` returns
+    a new instance, so groups can be shared between QuarterStats versions.
+    """
+
+    def __init__(self, values: dict = None, count: int = 0):
+        self.values = values or {name: np.empty(0) for name in METRICS}
+        self.count = count
+
+    @classmethod
+    def from_columns(cls, columns: dict, count: int) -> "OrderStats":
+        return cls({name: np.sort(v[~np.isnan(v)]) for name, v in columns.items()}, count)
+
+    def updated(self, removed: np.ndarray, added: np.ndarray) -> "OrderStats":
+        """
+        New stats with the `removed` cells taken out and the `added` cells put in.
+        Both are (n, len(METRICS)) arrays; removed cells must be present.
+        """
+        values = {}
+        for i, name in enumerate(METRICS):
+            current = self.values[name]
+            out = np.sort(removed[:, i][~np.isnan(removed[:, i])])
+            if len(out):
+                # Equal values sit next to each other: the k-th copy is k places on.
+                ranks = np.arange(len(out)) - np.searchsorted(out, out)
+                current = np.delete(current, np.searchsorted(current, out) + ranks)
+            inn = np.sort(added[:, i][~np.isnan(added[:, i])])
+            if len(inn):
+                current = np.insert(current, np.searchsorted(current, inn), inn)
+            values[name] = current
+        return OrderStats(values, self.count - len(removed) + len(added))
+
+    def median(self, name: str) -> float:
+        values = self.values[name]
+        n = len(values)
+        if n == 0:
+            return np.nan
+        if n % 2:
+            return float(values[n // 2])
+        return float((values[n // 2 - 1] + values[n // 2]) / 2)
+
+    def max(self, name: str) -> float:
+        values = self.values[name]
+        return float(values[-1]) if len(values) else np.nan
+
+
+def _group_stats(keys: np.ndarray, matrix: np.ndarray) -> dict:
+    """
+    OrderStats of the rows of `matrix` (one column per metric) grouped by `keys`.
+    One sort per metric orders every group at once; each group's values are views
+    into the sorted column.
+    """
+    codes, uniques = pd.factorize(keys)
+    counts = np.bincount(codes, minlength=len(uniques))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    columns = {}
+    for i, name in enumerate(METRICS):
+        column = matrix[:, i]
+        # NaN sorts last within each group, so the valid values are a prefix.
+        ordered = column[np.lexsort((column, codes))]
+        valid = np.bincount(codes[~np.isnan(column)], minlength=len(uniques))
+        columns[name] = [ordered[start:start + n] for start, n in zip(starts, valid)]
+    return {
+        key: OrderStats({name: columns[name][g] for name in METRICS}, int(counts[g]))
+        for g, key in enumerate(uniques.tolist())
+    }
+
+
+def _split(keys: np.ndarray, matrix: np.ndarray) -> dict:
+    """
+    Rows of `matrix` grouped by `keys`, in their original order within each group.
+    """
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+    return dict(zip(uniques.tolist(), np.split(matrix[order], bounds)))
+
+
+class QuarterStats:
+    """
+    Aggregates over the dataset's cells, i.e. the latest row of each
+    (company, quarter) pair: per-quarter counts, medians and maxima, per-company
+    and global medians, and the company x quarter DebtCoverage matrix.
+
+    `cells` maps each company to its quarter ordinals (sorted) and the matching
+    (n, len(METRICS)) array of metric values.
+
+    Built once from a frame; `updated(rows)` returns a new instance that shares
+    every untouched group and only re-sorts the quarters and companies the rows
+    touch, so a refresh never regroups the whole dataset.
+    """
+
+    def __init__(self):
+        self.cells = {}
+        self.symbols = {}
+        self.by_quarter = {}
+        self.by_company = {}
+        self.overall = OrderStats()
+        self.coverage = pd.DataFrame(dtype=np.float64)
+
+    @staticmethod
+    def _cells_frame(df: pd.DataFrame) -> pd.DataFrame:
+        ccp = df["CCP"].to_numpy(dtype=np.float64)
+        ltd = df["LTD"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coverage = np.where(ltd != 0, ccp / ltd, np.nan)
+        cells = pd.DataFrame({
+            "CompanyName": df["CompanyName"].to_numpy(),
+            "Symbol": df["Symbol"].to_numpy(),
+            "Quarter": cell_quarters(df["QuarterStart"]),
+            "CCP": ccp,
+            "LTD": ltd,
+            "DebtCoverage": coverage,
+        })
+        cells = cells[(cells["Quarter"] >= 0) & cells["CompanyName"].notna()]
+        return cells.drop_duplicates(["CompanyName", "Quarter"], keep="last")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "QuarterStats":
+        stats = cls()
+        cells = cls._cells_frame(df)
+        companies = cells["CompanyName"].to_numpy()
+        quarters = cells["Quarter"].to_numpy()
+        matrix = cells[list(METRICS)].to_numpy(dtype=np.float64)
+
+        codes, names = pd.factorize(companies)
+        order = np.lexsort((quarters, codes))
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(names)))))
+        sorted_quarters, sorted_matrix = quarters[order], matrix[order]
+        stats.cells = {
+            name: (sorted_quarters[start:stop], sorted_matrix[start:stop])
+            for name, start, stop in zip(names.tolist(), bounds[:-1], bounds[1:])
+        }
+        stats.symbols = dict(zip(companies, cells["Symbol"].to_numpy()))
+
+        stats.by_quarter = _group_stats(quarters, matrix)
+        stats.by_company = _group_stats(companies, matrix)
+        stats.overall = OrderStats.from_columns({m: matrix[:, i] for i, m in enumerate(METRICS)}, len(cells))
+        stats.coverage = (
+            cells.pivot(index="CompanyName", columns="Quarter", values="DebtCoverage")
+                 .sort_index()
+                 .sort_index(axis=1)
+        )
+        return stats
+
+    def updated(self, rows: pd.DataFrame) -> "QuarterStats":
+        """
+        New stats with prepared rows applied; a row replaces the existing cell for
+        the same company and quarter. This instance is left unchanged.
+        """
+        new = QuarterStats()
+        new.cells = dict(self.cells)
+        new.symbols = dict(self.symbols)
+        new.by_quarter = dict(self.by_quarter)
+        new.by_company = dict(self.by_company)
+
+        cells = self._cells_frame(rows)
+        empty = np.empty((0, len(METRICS)))
+        removed, added = [], []  # (companies, quarters, values) of replaced and new cells
+        for company, group in cells.groupby("CompanyName", sort=False):
+            quarters = group["Quarter"].to_numpy()
+            values = group[list(METRICS)].to_numpy(dtype=np.float64)
+            old_quarters, old_values = new.cells.get(company, (np.empty(0, dtype=np.int64), empty))
+
+            positions = np.searchsorted(old_quarters, quarters)
+            found = positions < len(old_quarters)
+            found[found] = old_quarters[positions[found]] == quarters[found]
+            removed.append(([company] * found.sum(), quarters[found], old_values[positions[found]]))
+            added.append(([company] * len(quarters), quarters, values))
+
+            cell_values = old_values.copy()
+            cell_values[positions[found]] = values[found]
+            order = np.argsort(quarters[~found], kind="stable")
+            new.cells[company] = (
+                np.insert(old_quarters, positions[~found][order], quarters[~found][order]),
+                np.insert(cell_values, positions[~found][order], values[~found][order], axis=0),
+            )
+            new.symbols[company] = group["Symbol"].iloc[-1]
+
+        def stacked(changes: list) -> tuple:
+            companies = np.array([c for names, _, _ in changes for c in names], dtype=object)
+            quarters = np.concatenate([q for _, q, _ in changes] or [np.empty(0, dtype=np.int64)])
+            return companies, quarters, np.concatenate([v for _, _, v in changes] or [empty])
+
+        removed, added = stacked(removed), stacked(added)
+        for groups, k in ((new.by_company, 0), (new.by_quarter, 1)):
+            out, inn = _split(removed[k], removed[2]), _split(added[k], added[2])
+            for key in inn:
+                groups[key] = groups.get(key, OrderStats()).updated(out.get(key, empty), inn[key])
+        new.overall = self.overall.updated(removed[2], added[2])
+
+        coverage = self.coverage
+        if not (set(cells["CompanyName"]) <= set(coverage.index) and set(cells["Quarter"]) <= set(coverage.columns)):
+            coverage = coverage.reindex(
+                index=sorted(set(coverage.index) | set(cells["CompanyName"])),
+                columns=sorted(set(coverage.columns) | set(cells["Quarter"])),
+            )
+        values = coverage.to_numpy(dtype=np.float64, copy=True)
+        values[coverage.index.get_indexer(cells["CompanyName"]), coverage.columns.get_indexer(cells["Quarter"])] = (
+            cells["DebtCoverage"].to_numpy()
+        )
+        new.coverage = pd.DataFrame(values, index=coverage.index, columns=coverage.columns)
+        return new
+
+    @property
+    def quarters(self) -> list:
+        return sorted(self.by_quarter)
+
+    def quarter(self, quarter: int) -> OrderStats:
+        return self.by_quarter[quarter]
+
+    def max_coverage(self) -> float:
+        return self.overall.max("DebtCoverage")
+
+    def company_medians(self) -> pd.DataFrame:
+        """
+        Median CCP, LTD and DebtCoverage of each company across its quarters, by name.
+        """
+        names = sorted(self.by_company)
+        return pd.DataFrame({
+            "CompanyName": names,
+            **{m: [self.by_company[name].median(m) for name in names] for m in METRICS},
+            "Symbol": [self.symbols[name] for name in names],
+        })
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per quarter: number of companies reporting, median CCP and LTD,
+        and the highest DebtCoverage.
+        """
+        quarters = self.quarters
+        return pd.DataFrame({
+            "Quarter": quarters,
+            "Companies": [self.by_quarter[q].count for q in quarters],
+            "MedianCCP": [self.by_quarter[q].median("CCP") for q in quarters],
+            "MedianLTD": [self.by_quarter[q].median("LTD") for q in quarters],
+            "MaxDebtCoverage": [self.by_quarter[q].max("DebtCoverage") for q in quarters],
+        })
@@ -0,0 +1,126 @@
+import threading
+
+import pandas as pd
+
+from app.mongo_source import ColumnBuffer, load_collection
+
+
+def is_affected(key: tuple, companies: set, quarters: set) -> bool:
+    """
+    Whether a cache entry depends on any of the changed companies or quarters.
+
+    Entries named "metrics/<SYMBOL>" depend on one company. Entries whose params
+    carry "companies" (and optionally "from_quarter"/"to_quarter" ordinals) depend
+    on that subset. Everything else covers the whole dataset and is always affected.
+    """
+    name, _version, params = key
+    if name.startswith("metrics/"):
+        return name.split("/", 1)[1] in companies
+
+    params = dict(params)
+    scoped = params.get("companies")
+    if scoped is None:
+        return True
+    if not companies.intersection(scoped):
+        return False
+    lo, hi = params.get("from_quarter"), params.get("to_quarter")
+    if lo is None and hi is None:
+        return True
+    return any((lo is None or q >= lo) and (hi is None or q <= hi) for q in quarters)
+
+
+class MongoRefresher:
+    """
+    Background thread that feeds new or changed MongoDB documents to on_rows.
+
+    mode="poll" checks for documents with an _id above the high-water mark every
+    `interval` seconds; this sees inserts only. mode="changestream" follows a change
+    stream (replica sets only) and also sees updates and replacements, delivering
+    them in batches collected over at most `interval` seconds. The stream starts
+    when the refresher does, so once it is open one poll above the high-water mark
+    picks up documents inserted between the initial load and the watch.
+    """
+
+    def __init__(self, collection, fields, on_rows, high_water=None, interval: float = 60, mode: str = "poll"):
+        self.collection = collection
+        self.fields = tuple(fields)
+        self.on_rows = on_rows
+        self.high_water = high_water
+        self.interval = interval
+        self.mode = mode
+        self.updates = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        target = self._follow_change_stream if self.mode == "changestream" else self._poll_loop
+        self._thread = threading.Thread(target=target, name="mongo-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+
+    def poll_once(self) -> int:
+        """
+        Loads documents newer than the high-water mark and hands them to on_rows.
+        Returns the number of documents picked up.
+        """
+        query = {"_id": {"$gt": self.high_water}} if self.high_water is not None else {}
+        df = load_collection(self.collection, self.fields + ("_id",), query)
+        if df.empty:
+            return 0
+        self.high_water = df["_id"].max()
+        self._deliver(df.drop(columns="_id"))
+        return len(df)
+
+    def _deliver(self, df: pd.DataFrame):
+        self.on_rows(df)
+        self.updates += 1
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = repr(e)
+                print(f"Refresh failed: {e!r}")
+
+    def _follow_change_stream(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        resume_token = None
+        while not self._stop.is_set():
+            try:
+                with self.collection.watch(pipeline, full_document="updateLookup",
+                                           resume_after=resume_token,
+                                           max_await_time_ms=int(self.interval * 1000)) as stream:
+                    if resume_token is None and self.high_water is not None:
+                        # Rows the stream also delivers are merged again, which is harmless.
+                        self.poll_once()
+                    while not self._stop.is_set():
+                        docs = ColumnBuffer(self.fields, 16)
+                        change = stream.try_next()
+                        while change is not None:
+                            if change.get("fullDocument"):
+                                docs.append(change["fullDocument"])
+                            resume_token = stream.resume_token
+                            change = stream.try_next()
+                        if docs.size:
+                            self._deliver(docs.frame())
+                self.last_error = None
+            except Exception as e:
+                self.last_error = repr(e)
+                print(f"Change stream interrupted: {e!r}")
+                self._stop.wait(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "interval": self.interval,
+            "updates": self.updates,
+            "high_water": str(self.high_water) if self.high_water is not None else None,
+            "last_error": self.last_error,
+        }
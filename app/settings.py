@@ -0,0 +1,31 @@
+"""
+Where the dataset comes from, read from the environment (and .env) at import.
+
+Kept apart from app.app so that command-line tools (`python -m
+app.sqlite_source index`, `python -m app.shared_dataset publish`) can use the
+configured source without building the API and the dashboard.
+"""
+import os
+
+from dotenv import load_dotenv
+
+from app.mongo_source import DASHBOARD_FIELDS
+
+load_dotenv()
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+USE_MONGO = os.getenv("USE_MONGO", "false").lower() == "true"
+DATA_SOURCE = os.getenv("DATA_SOURCE", "file").lower()
+DATA_PATH = os.getenv("DATA_PATH", os.path.join(DATA_DIR, "financial_data.json"))
+PREPARED_CACHE = os.getenv("PREPARED_CACHE", "true").lower() == "true"
+PREPARED_CACHE_DIR = os.getenv("PREPARED_CACHE_DIR", os.path.join(os.path.dirname(DATA_PATH), ".cache"))
+MONGODB_URI = os.getenv("MONGODB_URI", "")
+DB_NAME = os.getenv("DB_NAME", "financial")
+COLLECTION = os.getenv("COLLECTION", "metrics")
+MONGO_FIELDS = DASHBOARD_FIELDS + tuple(f.strip() for f in os.getenv("MONGO_EXTRA_FIELDS", "").split(",") if f.strip())
+MONGO_POOL_SIZE = int(os.getenv("MONGO_POOL_SIZE", "10"))
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(DATA_DIR, "filings_demo_step3.sqlite"))
+SQLITE_QUERY = os.getenv("SQLITE_QUERY", "")
+SHARED_DATASET_DIR = os.getenv("SHARED_DATASET_DIR", "")
+SHARED_POLL_INTERVAL = float(os.getenv("SHARED_POLL_INTERVAL", "5"))
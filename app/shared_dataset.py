@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from app.arrow_io import _pyarrow
+from app.data_sources import DataSource, get_origin_source
+from app.data_store import DataStore
+from app.prepared_cache import write_prepared
+from app.settings import SHARED_DATASET_DIR
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+POINTER = "CURRENT"
+LOCK = ".publish.lock"
+KEEP_VERSIONS = 2
+# Attempts to attach the current version when a newer publish removes the file
+# between reading the pointer and opening it.
+ATTACH_ATTEMPTS = 5
+# String columns the figure builders and the store's indexes compute on become regular
+# object columns. The other string columns are only passed through to API responses:
+# they stay Arrow-backed on the mapped file, so every worker shares them instead of
+# holding its own Python strings.
+COMPUTED_COLUMNS = ("Symbol", "CompanyName", "ReportQuarter")
+
+
+def read_pointer(directory: str):
+    """
+    The published version ({"version", "file", "rows", "published"}), or None.
+    """
+    try:
+        with open(os.path.join(directory, POINTER)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def publish(store: DataStore, directory: str) -> dict:
+    """
+    Writes the store's frame as a new version and makes it current.
+
+    The data file is written under a temporary name and renamed, and the pointer
+    is replaced the same way, so readers see either the old or the new version in
+    full. Superseded files are removed except the last KEEP_VERSIONS; workers
+    that still map a removed file keep reading it until they switch.
+    """
+    os.makedirs(directory, exist_ok=True)
+    filename = f"dataset-{store.version}.arrow"
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        write_prepared(store.frame, path, store.version)
+
+    pointer = {"version": store.version, "file": filename, "rows": len(store), "published": time.time()}
+    tmp_path = os.path.join(directory, f"{POINTER}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(pointer, f)
+    os.replace(tmp_path, os.path.join(directory, POINTER))
+
+    versions = sorted(
+        (name for name in os.listdir(directory) if name.startswith("dataset-") and name.endswith(".arrow")),
+        key=lambda name: os.path.getmtime(os.path.join(directory, name)),
+        reverse=True,
+    )
+    for stale in [name for name in versions if name != filename][KEEP_VERSIONS - 1:]:
+        try:
+            os.remove(os.path.join(directory, stale))
+        except OSError:
+            pass
+    return pointer
+
+
+def attach(path: str) -> pd.DataFrame:
+    """
+    Memory-maps a published file read-only. Numeric columns without nulls and the
+    pass-through string columns reference the mapped pages; the computed string
+    columns are materialized as Python objects, one per distinct value.
+    """
+    pa = _pyarrow()
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    passthrough = {
+        field.name for field in table.schema
+        if pa.types.is_string(field.type) and field.name not in COMPUTED_COLUMNS
+    }
+    frame = table.select([name for name in table.column_names if name not in passthrough]).to_pandas(split_blocks=True)
+    for position, name in enumerate(table.column_names):
+        if name in passthrough:
+            frame.insert(position, name, pd.arrays.ArrowExtensionArray(table.column(name)))
+    return frame
+
+
+class SharedSource(DataSource):
+    """
+    Attaches the dataset published in `directory`. When nothing has been published
+    yet, the first worker to get the publish lock loads `origin` and publishes it;
+    the others wait for the lock and attach the result.
+    """
+
+    name = "shared"
+
+    def __init__(self, directory: str, origin: DataSource):
+        self.directory = directory
+        self.origin = origin
+        self.name = f"shared {origin.name}"
+        self.version = None
+
+    def load_sync(self) -> pd.DataFrame:
+        for attempt in range(ATTACH_ATTEMPTS):
+            pointer = read_pointer(self.directory)
+            if pointer is None:
+                pointer = self._publish_origin()
+            try:
+                frame = attach(os.path.join(self.directory, pointer["file"]))
+            except FileNotFoundError:
+                # Superseded and removed since the pointer was read: read it again.
+                if attempt == ATTACH_ATTEMPTS - 1:
+                    raise
+                continue
+            self.version = pointer["version"]
+            return frame
+
+    def make_store(self, df: pd.DataFrame) -> DataStore:
+        return DataStore(df, presorted=True, version=self.version)
+
+    def _publish_origin(self) -> dict:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            pointer = read_pointer(self.directory)
+            if pointer is None:
+                print(f"No shared dataset in {self.directory}; publishing from {self.origin.name}")
+                pointer = publish(self.origin.make_store(self.origin.load_sync()), self.directory)
+            return pointer
+
+
+class SharedDatasetWatcher:
+    """
+    Background thread that attaches newly published versions and hands the new
+    store to on_store. A version is swapped in whole: requests see either the old
+    store or the new one.
+    """
+
+    def __init__(self, source: SharedSource, on_store, interval: float = 5):
+        self.source = source
+        self.on_store = on_store
+        self.interval = interval
+        self.updates = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._poll_loop, name="shared-dataset-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+
+    def poll_once(self) -> bool:
+        """
+        Attaches the published version if it differs from the current one.
+        Returns whether a new version was swapped in.
+        """
+        pointer = read_pointer(self.source.directory)
+        if pointer is None or pointer["version"] == self.source.version:
+            return False
+        self.on_store(self.source.make_store(self.source.load_sync()))
+        self.updates += 1
+        return True
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = repr(e)
+                print(f"Shared dataset refresh failed: {e!r}")
+
+    def stats(self) -> dict:
+        return {
+            "mode": "shared",
+            "interval": self.interval,
+            "updates": self.updates,
+            "version": self.source.version,
+            "last_error": self.last_error,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prepare the dashboard dataset once and publish it for server workers to attach."
+    )
+    parser.add_argument("command", choices=("publish",))
+    parser.add_argument("--dir", default=None, help="defaults to SHARED_DATASET_DIR")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="reload the source and publish changes every N seconds (0: publish once)")
+    args = parser.parse_args()
+
+    directory = args.dir or SHARED_DATASET_DIR
+    if not directory:
+        parser.error("set SHARED_DATASET_DIR or pass --dir")
+    origin = get_origin_source()
+    while True:
+        store = origin.make_store(origin.load_sync())
+        current = read_pointer(directory)
+        if current is None or current["version"] != store.version:
+            publish(store, directory)
+            print(f"Published {len(store)} records from {origin.name} as version {store.version}")
+        if args.interval <= 0:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+
+# The dashboard dataset (the shape of data/financial_data.json) as one join over the
+# filings database: every Tasks row with its Form and the Stock matching the Form's CIK.
+# ReportQuarter follows the Tableau exporter: period ends in the first four days of a
+# quarter still belong to the previous one.
+FILINGS_QUERY = """
+SELECT
+    t.Form_id, t.TextListLen, t.TableIndex, t.SumDivider, t.JsonTable, t.ValueColumn, t.CCP, t.LTD,
+    f.id, f.FormName, f.CIK, f.ValueDate, f.FilingDate, f.FormURL,
+    s.Symbol, s.CompanyName,
+    'Q' || (
+        (CAST(strftime('%m', f.ValueDate) AS INTEGER) - 1) / 3 + 1
+        - (CAST(strftime('%m', f.ValueDate) AS INTEGER) IN (4, 7, 10)
+           AND CAST(strftime('%d', f.ValueDate) AS INTEGER) <= 4)
+    ) || ' ' || strftime('%Y', f.ValueDate) AS ReportQuarter
+FROM Tasks AS t
+JOIN Forms AS f ON f.id = t.Form_id
+JOIN Stocks AS s ON s.CIK = f.CIK
+ORDER BY t.rowid
+"""
+
+# Forms.id is the rowid already; the join also looks up Tasks by Form_id and Stocks
+# (and Forms, when filtering by company) by CIK. The Stocks index covers the columns
+# the join reads, so those lookups never touch the table.
+FILINGS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_tasks_form_id ON Tasks(Form_id)",
+    "CREATE INDEX IF NOT EXISTS idx_forms_cik ON Forms(CIK, id)",
+    "CREATE INDEX IF NOT EXISTS idx_stocks_cik ON Stocks(CIK, Symbol, CompanyName)",
+)
+
+
+def connect_readonly(path: str) -> sqlite3.Connection:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No such SQLite database: {path}")
+    return sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+
+
+def ensure_indexes(path: str) -> bool:
+    """
+    Creates the join's indexes when they are missing. Returns False when the
+    database cannot be written to; the join still works, only slower.
+    Run explicitly (`python -m app.sqlite_source index`); the app itself only
+    opens the database read-only.
+    """
+    try:
+        with closing(sqlite3.connect(path)) as conn, conn:
+            for statement in FILINGS_INDEXES:
+                conn.execute(statement)
+        return True
+    except sqlite3.OperationalError as e:
+        print(f"SQLite indexes not created ({e}); continuing without them")
+        return False
+
+
+def load_filings(path: str, query: str = FILINGS_QUERY) -> pd.DataFrame:
+    with closing(connect_readonly(path)) as conn:
+        return pd.read_sql(query, conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the indexes the dashboard's SQLite join uses.")
+    parser.add_argument("command", choices=("index",))
+    parser.add_argument("--path", default=None, help="defaults to SQLITE_PATH")
+    args = parser.parse_args()
+
+    from app.settings import SQLITE_PATH
+
+    path = args.path or SQLITE_PATH
+    if not os.path.exists(path):
+        parser.error(f"no such SQLite database: {path}")
+    if not ensure_indexes(path):
+        raise SystemExit(1)
+    print(f"Indexes ready in {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.profiling import profiled
+
+
+API_WORKERS = int(os.getenv("API_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+LATENCY_WINDOW = 1024
+_done = object()
+
+
+class WorkerPool:
+    """
+    Bounded thread pool that tracks its queue depth and the wait and run time of
+    the last LATENCY_WINDOW tasks.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.max_queued = 0
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+        self._runs = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    def submit(self, func, *args, **kwargs):
+        enqueued = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self._waits.append(started - enqueued)
+                    self._runs.append(finished - started)
+
+        return self._executor.submit(task)
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) on the pool and awaits its result.
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = np.array(self._waits) * 1000
+            totals = waits + np.array(self._runs) * 1000
+            stats = {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "max_queued": self.max_queued,
+                "active": self.active,
+                "completed": self.completed,
+            }
+        for label, values in (("wait_ms", waits), ("latency_ms", totals)):
+            stats[label] = {
+                "p50": round(float(np.percentile(values, 50)), 2) if len(values) else None,
+                "p99": round(float(np.percentile(values, 99)), 2) if len(values) else None,
+            }
+        return stats
+
+
+# CPU-heavy work (selection, serialization, figure builds) done on behalf of async
+# API handlers, so the event loop itself never blocks on it.
+api_pool = WorkerPool("api-cpu", API_WORKERS)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs) on the bounded API pool and awaits its result.
+    When the calling request is being profiled, the call is part of its profile.
+    """
+    return await api_pool.run(profiled(func), *args, **kwargs)
+
+
+async def iterate_blocking(iterator):
+    """
+    Async iterator over a blocking iterator whose items are produced on the API pool.
+    Used to stream chunked encodings without tying up the event loop.
+    """
+    iterator = iter(iterator)
+    while True:
+        item = await run_blocking(next, iterator, _done)
+        if item is _done:
+            return
+        yield item
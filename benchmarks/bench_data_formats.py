@@ -0,0 +1,56 @@
+"""
+Payload size and encode time of /data output formats: JSON (as FastAPI encodes the
+record list), Arrow IPC stream and Parquet.
+
+Usage:
+    python -m benchmarks.bench_data_formats [--sizes 10000 100000 1000000]
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.arrow_io import arrow_stream_bytes, parquet_bytes
+from app.data_store import DataStore
+from app.figures_builder import prepare_data
+from benchmarks.synthetic import synthetic_records
+
+QUARTERS = 40
+
+
+def encode_json(store):
+    records = store.frame.to_dict(orient="records")
+    return json.dumps(jsonable_encoder(records), allow_nan=False).encode("utf-8")
+
+
+def encode_arrow(store):
+    return arrow_stream_bytes(store.arrow_table())
+
+
+def encode_parquet(store):
+    return parquet_bytes(store.arrow_table())
+
+
+ENCODERS = {"json": encode_json, "arrow": encode_arrow, "parquet": encode_parquet}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'format':>8} {'bytes':>14} {'seconds':>9}")
+    for rows in args.sizes:
+        store = DataStore(prepare_data(synthetic_records(max(rows // QUARTERS, 1), QUARTERS)))
+        store.arrow_table()
+
+        for name, encode in ENCODERS.items():
+            start = time.perf_counter()
+            body = encode(store)
+            elapsed = time.perf_counter() - start
+            print(f"{len(store):>10,} {name:>8} {len(body):>14,} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Scaling of the parallel SQLite exporter with the number of worker processes.
+
+Builds a synthetic filings database (Forms/Tasks/Stocks shaped) and exports it with
+--workers 1, 2, 4 and 8, checking that every run produces identical files:
+    python -m benchmarks.bench_export --rows 2000000 --format csv
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+EXPORTER = os.path.join(os.path.dirname(__file__), "..", "tableau", "export_sqlite_tables.py")
+
+
+def build_database(path: str, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, rows + 1)
+    days = rng.integers(0, 25 * 365, rows)
+    dates = (np.datetime64("2000-01-01") + days).astype(str)
+    ciks = rng.integers(1_000, 2_000_000, rows)
+
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Forms (id INTEGER PRIMARY KEY, FormName TEXT, CIK INTEGER, "
+                 "ValueDate DATE, FilingDate DATE, FormURL TEXT)")
+    conn.execute('CREATE TABLE Tasks ("Form_id" INT, "TextListLen" INT, "TableIndex" INT, "SumDivider" INT, '
+                 '"JsonTable" INT, "ValueColumn" INTEGER, "CCP" REAL, "LTD" REAL)')
+    conn.execute("CREATE TABLE Stocks (Symbol TEXT PRIMARY KEY, CompanyName TEXT, CIK INTEGER)")
+    conn.executemany(
+        "INSERT INTO Forms VALUES (?, ?, ?, ?, ?, ?)",
+        ((int(i), f"form-{i}", int(c), d, d, f"https://www.sec.gov/Archives/edgar/data/{c}/{i}.htm")
+         for i, c, d in zip(ids, ciks, dates)),
+    )
+    ccp = np.round(rng.lognormal(9, 1.5, rows), 1)
+    ltd = np.round(rng.lognormal(9, 1.5, rows), 1)
+    conn.executemany(
+        "INSERT INTO Tasks VALUES (?, 1, 0, 1, 1, 0, ?, ?)",
+        ((int(i), float(a), float(b)) for i, a, b in zip(ids, ccp, ltd)),
+    )
+    conn.executemany("INSERT INTO Stocks VALUES (?, ?, ?)",
+                     ((f"S{i:04d}", f"Company {i}", i) for i in range(1_000)))
+    conn.commit()
+    conn.close()
+
+
+def digest(directory: str) -> str:
+    h = hashlib.sha1()
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            h.update(name.encode())
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--shard-rows", type=int, default=250_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "filings.sqlite")
+        build_database(database, args.rows)
+
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}  output")
+        baseline, reference = None, None
+        for workers in args.workers:
+            out = os.path.join(tmp, f"out-{workers}")
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, EXPORTER, database, "--out", out, "--format", args.format,
+                 "--chunksize", str(args.chunksize), "--shard-rows", str(args.shard_rows),
+                 "--workers", str(workers)],
+                check=True, stdout=subprocess.DEVNULL,
+            )
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            reference = reference or digest(out)
+            same = "identical" if digest(out) == reference else "DIFFERENT"
+            print(f"{workers:>8} {seconds:>9.2f} {baseline / seconds:>7.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
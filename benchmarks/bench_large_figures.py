@@ -0,0 +1,60 @@
+"""
+Build time, payload size and render time of fig1/fig2 in default vs large-dataset mode.
+
+    python -m benchmarks.bench_large_figures --companies 500 --quarters 160 --budget 20000
+Render time is measured with a static export when the optional 'kaleido' package
+is installed; otherwise the point count is the proxy for browser work.
+"""
+import argparse
+import gzip
+import time
+
+import plotly.io as pio
+
+from app.figures_builder import prepare_data, generate_company_colors, create_fig_1, create_fig_2
+from benchmarks.synthetic import synthetic_records
+
+FIGURES = {"fig1": create_fig_1, "fig2": create_fig_2}
+
+
+def render_seconds(fig):
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return None
+    start = time.perf_counter()
+    fig.to_image(format="png")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--quarters", type=int, default=160)
+    parser.add_argument("--budget", type=int, default=20_000, help="point budget in large mode")
+    args = parser.parse_args()
+
+    df = prepare_data(synthetic_records(args.companies, args.quarters))
+    company_colors = generate_company_colors(df)
+    print(f"{args.companies} companies x {args.quarters} quarters = {len(df):,} rows")
+
+    print(f"{'figure':>6} {'mode':>8} {'points':>9} {'build s':>8} {'json s':>7} {'JSON MB':>8} {'gzip MB':>8} {'render s':>9}")
+    for name, builder in FIGURES.items():
+        for mode, large in (("default", False), ("large", True)):
+            start = time.perf_counter()
+            fig = builder(df, company_colors, large=large, point_budget=args.budget)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            body = pio.to_json(fig, validate=False).encode("utf-8")
+            serialize = time.perf_counter() - start
+
+            points = sum(len(trace.x) for trace in fig.data if trace.x is not None)
+            render = render_seconds(fig)
+            print(f"{name:>6} {mode:>8} {points:>9,} {build:>8.2f} {serialize:>7.2f} "
+                  f"{len(body) / 1e6:>8.2f} {len(gzip.compress(body)) / 1e6:>8.2f} "
+                  f"{'n/a' if render is None else f'{render:.2f}':>9}")
+
+
+if __name__ == "__main__":
+    main()
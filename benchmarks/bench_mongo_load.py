@@ -0,0 +1,90 @@
+"""
+Load time and peak RSS of the MongoDB loader vs. the previous list(find()) approach.
+
+Each loader runs in a fresh process. Against a local mongod:
+    python -m benchmarks.bench_mongo_load --uri mongodb://localhost:27017 --docs 1000000
+Without a server, an in-process mongomock collection stands in (its own memory is
+excluded by measuring growth over the RSS reached after seeding it):
+    python -m benchmarks.bench_mongo_load --docs 100000
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+
+import pandas as pd
+
+from app.mongo_source import load_collection
+from benchmarks.synthetic import synthetic_records
+
+DB_NAME = "financial_dashboard_bench"
+QUARTERS = 40
+
+
+def load_legacy(col):
+    return pd.DataFrame(list(col.find({}, {"_id": 0})))
+
+
+def load_batched(col):
+    return load_collection(col)
+
+
+LOADERS = {"legacy": load_legacy, "batched": load_batched}
+
+
+def seed(col, docs: int):
+    if col.estimated_document_count() == docs:
+        return
+    col.delete_many({})
+    records = synthetic_records(max(docs // QUARTERS, 1), QUARTERS).to_dict(orient="records")
+    for start in range(0, len(records), 50_000):
+        col.insert_many(records[start:start + 50_000])
+
+
+def collection(uri: str, docs: int):
+    if uri:
+        from pymongo import MongoClient
+        return MongoClient(uri)[DB_NAME]["metrics"]
+    import mongomock
+    col = mongomock.MongoClient()[DB_NAME]["metrics"]
+    seed(col, docs)
+    return col
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(name, uri, docs, results):
+    col = collection(uri, docs)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    df = LOADERS[name](col)
+    results[name] = (len(df), time.perf_counter() - start, peak_rss_mb() - baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uri", default="", help="MongoDB URI; mongomock is used when empty")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.uri:
+        seed(collection(args.uri, args.docs), args.docs)
+
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as manager:
+        results = manager.dict()
+        for name in LOADERS:
+            process = ctx.Process(target=run, args=(name, args.uri, args.docs, results))
+            process.start()
+            process.join()
+
+        print(f"{'loader':>8} {'rows':>10} {'seconds':>9} {'peak RSS +MB':>13}")
+        for name in LOADERS:
+            rows, seconds, rss = results[name]
+            print(f"{name:>8} {rows:>10,} {seconds:>9.2f} {rss:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark: vectorized prepare_data vs. the previous per-row regex implementation.
+
+Usage:
+    python -m benchmarks.bench_prepare_data [--rows 1000000]
+"""
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.figures_builder import prepare_data
+
+
+def prepare_data_legacy(df):
+    df = df.copy()
+
+    def parse_quarter(qstr):
+        if pd.isna(qstr):
+            return pd.NaT
+        qstr = str(qstr).strip()
+        match = re.match(r"Q([1-4])\s+(\d{4})", qstr)
+        if match:
+            q = int(match.group(1))
+            year = int(match.group(2))
+            return pd.Period(year=year, quarter=q, freq="Q").to_timestamp(how="start")
+        return pd.NaT
+
+    df["QuarterStart"] = df["ReportQuarter"].apply(parse_quarter)
+
+    df["ReportQuarter"] = pd.to_datetime(df["QuarterStart"]).dt.to_period("Q").astype(str)
+
+    return df.sort_values(["Symbol", "QuarterStart"])
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1995, 2025, rows)
+    quarters = rng.integers(1, 5, rows)
+    labels = pd.Series([f"Q{q} {y}" for q, y in zip(quarters, years)], dtype=object)
+    labels[rng.random(rows) < 0.001] = None
+    return pd.DataFrame({
+        "Symbol": rng.choice([f"T{i:04d}" for i in range(2000)], rows),
+        "ReportQuarter": labels,
+        "CCP": rng.random(rows) * 1e5,
+        "LTD": rng.random(rows) * 1e5,
+    })
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    out = func(df)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+
+    new, new_time = timed(prepare_data, df)
+    old, old_time = timed(prepare_data_legacy, df)
+
+    pd.testing.assert_series_equal(new["QuarterStart"], old["QuarterStart"], check_dtype=False)
+    pd.testing.assert_series_equal(new["ReportQuarter"], old["ReportQuarter"], check_dtype=False)
+
+    print(f"rows:        {args.rows:,}")
+    print(f"legacy:      {old_time:8.3f} s")
+    print(f"vectorized:  {new_time:8.3f} s")
+    print(f"speedup:     {old_time / new_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
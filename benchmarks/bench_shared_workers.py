@@ -0,0 +1,88 @@
+"""
+Total memory of N server workers: each loading the dataset vs attaching a shared one.
+
+Starts N worker processes that import the app and load the dataset, then sums their
+proportional set size (PSS, which splits shared pages between the processes that
+map them), for a private load of the JSON file and for SHARED_DATASET_DIR. The
+memory of N workers that only import the app is subtracted, leaving the dataset's share:
+    python -m benchmarks.bench_shared_workers --companies 2000 --quarters 40 --workers 1 2 4 8
+Linux only (reads /proc/<pid>/smaps_rollup).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_records
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+WORKER = """
+import sys
+import app.app as a
+print(len(a.current_store()) if sys.argv[1] == "load" else 0, flush=True)
+sys.stdin.readline()
+"""
+
+
+def pss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    raise RuntimeError("no Pss line in smaps_rollup")
+
+
+def run_workers(count: int, env: dict, load: bool = True) -> tuple:
+    """
+    Starts `count` workers, waits until all have loaded the dataset (or only
+    imported the app), and returns (seconds until all were ready, total PSS in MB).
+    """
+    start = time.perf_counter()
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WORKER, "load" if load else "import"], cwd=ROOT, env=env, text=True,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for _ in range(count)
+    ]
+    try:
+        for worker in workers:
+            if not worker.stdout.readline():
+                raise RuntimeError("worker exited before loading the dataset")
+        ready = time.perf_counter() - start
+        total = sum(pss_kb(worker.pid) for worker in workers) / 1024
+    finally:
+        for worker in workers:
+            worker.communicate("\n")
+    return ready, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=2000)
+    parser.add_argument("--quarters", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, "financial_data.json")
+        synthetic_records(args.companies, args.quarters).to_json(data_path, orient="records")
+        base = dict(os.environ, DATA_PATH=data_path, PREPARED_CACHE="false", PRELOAD="false", DASH_WORKERS="0")
+        shared_dir = os.path.join(tmp, "shared")
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "app.shared_dataset", "publish", "--dir", shared_dir],
+                       cwd=ROOT, env=base, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        print(f"{args.companies} companies x {args.quarters} quarters; published once in {time.perf_counter() - start:.2f} s")
+
+        print(f"{'workers':>8} {'app MB':>8} {'private MB':>11} {'ready s':>8} {'shared MB':>10} {'ready s':>8}")
+        for count in args.workers:
+            _, app_mb = run_workers(count, base, load=False)
+            private_ready, private_mb = run_workers(count, base)
+            shared_ready, shared_mb = run_workers(count, dict(base, SHARED_DATASET_DIR=shared_dir))
+            print(f"{count:>8} {app_mb:>8.0f} {private_mb - app_mb:>11.0f} {private_ready:>8.2f} "
+                  f"{shared_mb - app_mb:>10.0f} {shared_ready:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Import-time breakdown of the server, from `python -X importtime`.
+
+Imports a module (app.app by default) in fresh interpreters and reports the median
+total import time and the top-level packages that time is spent in:
+    python -m benchmarks.bench_startup --runs 5 --top 15
+    python -m benchmarks.bench_startup --out benchmarks/startup_report.txt
+Nothing is loaded from the data source; only module import is measured.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_times(module: str) -> tuple:
+    """
+    Imports `module` in a fresh interpreter. Returns its total import time in seconds
+    and the import time spent in each top-level package (the sum of its modules'
+    own times, so the packages add up to the total).
+    """
+    env = dict(os.environ, PRELOAD="false")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    total, packages = 0.0, {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, _, name = match.groups()
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0.0) + int(own) / 1e6
+        if name == module:
+            total = int(cumulative) / 1e6
+    return total, packages
+
+
+def report(module: str, runs: int, top: int) -> str:
+    samples = [import_times(module) for _ in range(runs)]
+    total = statistics.median(t for t, _ in samples)
+    names = set().union(*(packages for _, packages in samples))
+    medians = {name: statistics.median(p.get(name, 0.0) for _, p in samples) for name in names}
+
+    lines = [f"import {module}: {total:.3f} s (median of {runs} fresh interpreters, python {sys.version.split()[0]})",
+             "", f"{'package':<24} {'seconds':>8} {'share':>7}"]
+    for name, seconds in sorted(medians.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"{name:<24} {seconds:>8.3f} {seconds / total if total else 0:>7.1%}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--out", default=None, help="also write the report to this file")
+    args = parser.parse_args()
+
+    text = report(args.module, args.runs, args.top)
+    print(text, end="")
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
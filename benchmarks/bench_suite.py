@@ -0,0 +1,177 @@
+"""
+Scaling benchmark of the data pipeline and figure builders on synthetic datasets.
+
+For every size (companies x quarters) it measures wall time and peak traced memory of
+get_data_from_json, prepare_data, generate_company_colors, create_fig_1..create_fig_4
+and GET /data, plus the serialized size of each figure and of the /data body.
+Results are written as JSON and compared against a stored baseline:
+
+    python -m benchmarks.bench_suite --sizes 10 100 1000 5000 --out results.json
+    python -m benchmarks.bench_suite --save-baseline      # refresh benchmarks/baseline.json
+
+The exit status is 1 when any measurement regressed by more than its tolerance.
+Timings only compare meaningfully with a baseline recorded on the same machine.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Every run should parse the JSON file, not memory-map a prepared copy from an earlier run,
+# and the app must not load its own dataset on import or startup.
+os.environ.setdefault("PREPARED_CACHE", "false")
+os.environ.setdefault("PRELOAD", "false")
+
+import pandas as pd
+import plotly
+from fastapi.testclient import TestClient
+
+import app.app as dashboard
+from app.data_store import DataStore
+from app.figure_payload import FigurePayload
+from app.figures_builder import (
+    prepare_data, generate_company_colors, create_fig_1, create_fig_2, create_fig_3, create_fig_4
+)
+from benchmarks.synthetic import synthetic_records
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+FIGURES = {"create_fig_1": create_fig_1, "create_fig_2": create_fig_2, "create_fig_3": create_fig_3, "create_fig_4": create_fig_4}
+
+
+def measure(func, repeat: int) -> tuple:
+    """
+    Returns (result, best wall time in seconds, peak traced memory in MB).
+    Timed runs come first; the memory run is separate because tracing slows allocation down.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak / 1e6
+
+
+def bench_size(companies: int, quarters: int, repeat: int) -> list:
+    records = synthetic_records(companies, quarters)
+    results = []
+
+    def record(name, func, size_of=None):
+        result, seconds, peak_mb = measure(func, repeat)
+        entry = {"benchmark": name, "companies": companies, "rows": len(records),
+                 "seconds": round(seconds, 6), "peak_mb": round(peak_mb, 3)}
+        if size_of is not None:
+            entry["bytes"] = size_of(result)
+        results.append(entry)
+        print(f"{companies:>6} {name:<24} {seconds:>9.4f} s {peak_mb:>9.1f} MB"
+              + (f" {entry['bytes'] / 1e6:>9.2f} MB body" if "bytes" in entry else ""))
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "financial_data.json")
+        records.to_json(path, orient="records")
+        record("get_data_from_json", lambda: dashboard.get_data_from_json(path))
+
+    df = record("prepare_data", lambda: prepare_data(records))
+    company_colors = record("generate_company_colors", lambda: generate_company_colors(df))
+    for name, builder in FIGURES.items():
+        build = (lambda b=builder: b(df)) if builder is create_fig_3 else (lambda b=builder: b(df, company_colors))
+        record(name, build, lambda fig: len(FigurePayload.from_figure(fig).body))
+
+    dashboard.set_store(DataStore(df))
+    client = TestClient(dashboard.api)
+    record("GET /data", lambda: client.get("/data"), lambda response: len(response.content))
+    return results
+
+
+def compare(results: list, baseline: dict, tolerance: float, time_tolerance: float, min_seconds: float) -> list:
+    """
+    Measurements that are worse than the baseline by more than the tolerance
+    (a fraction; time_tolerance for wall time). Time differences below
+    min_seconds are treated as noise.
+    """
+    previous = {(e["benchmark"], e["companies"]): e for e in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry["benchmark"], entry["companies"]))
+        if old is None:
+            continue
+        for field in ("seconds", "peak_mb", "bytes"):
+            if field not in entry or field not in old or not old[field]:
+                continue
+            if field == "seconds" and entry[field] - old[field] < min_seconds:
+                continue
+            ratio = entry[field] / old[field]
+            if ratio > 1 + (time_tolerance if field == "seconds" else tolerance):
+                regressions.append({"benchmark": entry["benchmark"], "companies": entry["companies"],
+                                    "field": field, "baseline": old[field], "current": entry[field],
+                                    "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000], help="numbers of companies")
+    parser.add_argument("--quarters", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per measurement; the fastest counts")
+    parser.add_argument("--out", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed growth of memory and body size, as a fraction")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="allowed slowdown, as a fraction")
+    parser.add_argument("--min-seconds", type=float, default=0.1, help="ignore time differences below this")
+    args = parser.parse_args()
+
+    print(f"{'companies':>6} {'benchmark':<24} {'time':>11} {'peak memory':>12}")
+    results = [entry for companies in args.sizes for entry in bench_size(companies, args.quarters, args.repeat)]
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "plotly": plotly.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "quarters": args.quarters,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report["regressions"] = compare(
+                results, json.load(f), args.tolerance, args.time_tolerance, args.min_seconds
+            )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for r in report.get("regressions", []):
+        print(f"REGRESSION {r['benchmark']} @ {r['companies']} companies: "
+              f"{r['field']} {r['baseline']} -> {r['current']} ({r['ratio']}x)")
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Latency percentiles of light endpoints under concurrent clients, while heavy /data requests run.
+
+Start the server first (python -m app.app, or uvicorn app.app:api), then:
+    python -m benchmarks.load_test --url http://localhost:10000 --clients 64 --heavy 8 --seconds 20
+Light clients cycle through /health, /companies and /metrics/<symbol>; heavy clients
+download the full /data JSON in a loop. p99 of the light endpoints should stay close
+to their unloaded latency.
+
+--dash N adds N dashboard users switching tabs (Dash callbacks). The per-pool queue
+depth and latency from /health are printed at the end; compare DASH_WORKERS=0
+(Dash shares the server's default thread pool) with a dedicated pool.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+
+LIGHT_ENDPOINTS = ("/health", "/companies", "/metrics/{symbol}")
+HEAVY_ENDPOINT = "/data"
+DASH_CALLBACK = "/dashboard/_dash-update-component"
+TABS = ("tab1", "tab2", "tab3", "tab4")
+
+
+def dash_request(tab: str) -> dict:
+    return {
+        "output": "tabs-content.children",
+        "outputs": {"id": "tabs-content", "property": "children"},
+        "inputs": [
+            {"id": "tabs", "property": "value", "value": tab},
+            {"id": "company-filter", "property": "value", "value": None},
+            {"id": "quarter-range", "property": "value", "value": None},
+            {"id": "metric", "property": "value", "value": "both"},
+        ],
+        "changedPropIds": ["tabs.value"],
+    }
+
+
+async def client_loop(client, paths, deadline, latencies):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        if path == DASH_CALLBACK:
+            response = await client.post(path, json=dash_request(TABS[i % len(TABS)]))
+        else:
+            response = await client.get(path)
+        elapsed = time.perf_counter() - start
+        key = "/metrics" if path.startswith("/metrics/") else "/dashboard" if path == DASH_CALLBACK else path
+        latencies.setdefault(key, []).append(elapsed)
+        if response.status_code >= 400:
+            latencies.setdefault(f"{key} errors", []).append(elapsed)
+        i += 1
+
+
+async def run(url, clients, heavy, dash, seconds):
+    limits = httpx.Limits(max_connections=clients + heavy + dash)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        companies = (await client.get("/companies")).json()
+        symbol = companies[0]["Symbol"]
+        light = [path.format(symbol=symbol) for path in LIGHT_ENDPOINTS]
+
+        latencies = {}
+        deadline = time.perf_counter() + seconds
+        tasks = [client_loop(client, light[i % len(light):] + light[:i % len(light)], deadline, latencies)
+                 for i in range(clients)]
+        tasks += [client_loop(client, [HEAVY_ENDPOINT], deadline, latencies) for _ in range(heavy)]
+        tasks += [client_loop(client, [DASH_CALLBACK], deadline, latencies) for _ in range(dash)]
+        await asyncio.gather(*tasks)
+        workers = (await client.get("/health")).json().get("workers")
+    return latencies, workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:10000")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent light clients")
+    parser.add_argument("--heavy", type=int, default=8, help="concurrent full /data downloads")
+    parser.add_argument("--dash", type=int, default=0, help="concurrent dashboard users")
+    parser.add_argument("--seconds", type=float, default=20)
+    args = parser.parse_args()
+
+    latencies, workers = asyncio.run(run(args.url, args.clients, args.heavy, args.dash, args.seconds))
+
+    print(f"{'endpoint':>16} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for key, values in sorted(latencies.items()):
+        ms = np.array(values) * 1000
+        print(f"{key:>16} {len(ms):>9,} {np.percentile(ms, 50):>8.1f} {np.percentile(ms, 99):>8.1f} {ms.max():>8.1f}")
+
+    for side, stats in (workers or {}).items():
+        if stats:
+            print(f"{side} pool: {stats['workers']} workers, max queue {stats['max_queued']}, "
+                  f"wait p99 {stats['wait_ms']['p99']} ms, latency p99 {stats['latency_ms']['p99']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Synthetic datasets shaped like data/financial_data.json, for benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+
+def synthetic_records(companies: int, quarters: int, start_year: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """
+    One filing per company per quarter, with every field of financial_data.json.
+    ReportQuarter uses the raw 'Q4 2023' form expected by prepare_data.
+    """
+    rng = np.random.default_rng(seed)
+    rows = companies * quarters
+
+    company = np.repeat(np.arange(companies), quarters)
+    quarter = np.tile(np.arange(quarters), companies)
+    year = start_year + quarter // 4
+    q = quarter % 4 + 1
+
+    symbols = np.array([f"T{i:05d}" for i in range(companies)], dtype=object)
+    names = np.array([f"Company {i:05d} Inc." for i in range(companies)], dtype=object)
+    ciks = 100000 + np.arange(companies)
+
+    value_date = pd.to_datetime({"year": year, "month": q * 3, "day": 28})
+    filing_date = value_date + pd.to_timedelta(rng.integers(20, 60, rows), unit="D")
+    form_name = symbols[company].astype(str).astype(object) + "-" + value_date.dt.strftime("%Y%m%d").to_numpy(dtype=object)
+
+    base = rng.lognormal(9, 1.5, companies)
+    ccp = np.round(base[company] * rng.uniform(0.5, 1.5, rows))
+    ltd = np.round(base[company] * rng.uniform(0.3, 2.5, rows))
+
+    return pd.DataFrame({
+        "Form_id": np.arange(1, rows + 1),
+        "TextListLen": rng.integers(1, 6, rows),
+        "TableIndex": 0,
+        "SumDivider": 1,
+        "JsonTable": 1,
+        "ValueColumn": 0,
+        "CCP": ccp,
+        "LTD": ltd,
+        "id": np.arange(1, rows + 1),
+        "FormName": form_name,
+        "CIK": ciks[company],
+        "ValueDate": value_date.dt.strftime("%Y-%m-%d"),
+        "FilingDate": filing_date.dt.strftime("%Y-%m-%d"),
+        "FormURL": "https://www.sec.gov/Archives/edgar/data/" + ciks[company].astype(str).astype(object) + "/" + form_name + ".htm",
+        "Symbol": symbols[company],
+        "CompanyName": names[company],
+        "ReportQuarter": "Q" + q.astype(str).astype(object) + " " + year.astype(str).astype(object),
+    })
@@ -1,42 +1,429 @@
 # -*- coding: utf-8 -*-
+"""
+Exports the tables of the filings SQLite database to CSV (or Parquet) for Tableau.
 
+    python tableau/export_sqlite_tables.py data/filings_demo_step3.sqlite --out tableau
+    python tableau/export_sqlite_tables.py filings.sqlite --format parquet --chunksize 200000
+
+Tables are streamed in chunks and written incrementally, so memory use is bounded
+by --chunksize rather than by the size of the database.
+
+With --workers N, tables and row-range shards of large tables are exported by a
+pool of N processes, each with its own read-only connection; the output is
+byte-identical to the sequential run.
+"""
+import argparse
+import os
+import shutil
 import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-conn = sqlite3.connect('filings_demo_step3.sqlite')
-
-tables = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table';", conn)
-
-def report_quarter(date):
-    if pd.isna(date):
-        return pd.NaT
-    year = date.year
-    month = date.month
-    day = date.day
-    if month <= 3 or (month == 4 and day <= 4):
-        return pd.Timestamp(year, 1, 1)   # Q1 → 1 jan
-    elif month <= 6 or (month == 7 and day <= 4):
-        return pd.Timestamp(year, 4, 1)   # Q2 → 1 apr
-    elif month <= 9 or (month == 10 and day <= 4):
-        return pd.Timestamp(year, 7, 1)   # Q3 → 1 jul
-    else:
-        return pd.Timestamp(year, 10, 1)  # Q4 → 1 oct
-
-for table in tables['name']:
-    df = pd.read_sql(f'SELECT * FROM {table}', conn)
-
-    for col in df.columns:
-        if df[col].dtype == object:
-            try:
-                df[col] = df[col].str.replace(' ', '').astype(float)
-            except:
-                pass
-
-    if table == 'Forms':
-        df['ValueDate'] = pd.to_datetime(df['ValueDate'], format='%Y-%m-%d', errors='coerce')
-        df['ReportQuarter'] = df['ValueDate'].apply(report_quarter)
-
-    df.to_csv(f'{table}.csv', index=False, encoding='utf-8')
-    print(f'Table {table} has been saved to {table}.csv')
-
-conn.close()
\ No newline at end of file
+# Columns parsed as dates, and the date column each table's ReportQuarter is derived from.
+DATE_COLUMNS = {"Forms": ("ValueDate",)}
+QUARTER_SOURCE = {"Forms": "ValueDate"}
+CHUNKSIZE = 100_000
+SHARD_ROWS = 1_000_000
+
+
+def connect(path: str) -> sqlite3.Connection:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No such database: {path}")
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    conn.create_function("is_number", 1, is_number, deterministic=True)
+    return conn
+
+
+def list_tables(conn: sqlite3.Connection) -> list:
+    return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+
+
+def is_number(value) -> int:
+    """
+    1 when a text value parses as a float once spaces are removed ("1 234.5").
+    """
+    try:
+        float(value.replace(" ", ""))
+        return 1
+    except (AttributeError, ValueError):
+        return 0
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> list:
+    return [d[0] for d in conn.execute(f'SELECT * FROM "{table}" LIMIT 0').description]
+
+
+def has_rowid(conn: sqlite3.Connection, table: str) -> bool:
+    try:
+        conn.execute(f'SELECT rowid FROM "{table}" LIMIT 0')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def shard_filter(bounds) -> tuple:
+    """
+    WHERE clause and parameters for a half-open rowid range (lo, hi); None is unbounded.
+    """
+    if bounds is None:
+        return "", ()
+    lo, hi = bounds
+    clauses, params = [], []
+    if lo is not None:
+        clauses.append("rowid >= ?")
+        params.append(lo)
+    if hi is not None:
+        clauses.append("rowid < ?")
+        params.append(hi)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+
+def table_shards(conn: sqlite3.Connection, table: str, shard_rows: int) -> list:
+    """
+    Splits a table into rowid ranges of shard_rows rows each. Tables without a
+    rowid, or smaller than one shard, are a single unbounded shard.
+    """
+    if not has_rowid(conn, table):
+        return [None]
+    starts = [None]
+    while True:
+        # Each boundary is found by skipping shard_rows rows from the previous one.
+        where, params = shard_filter((starts[-1], None))
+        row = conn.execute(f'SELECT rowid FROM "{table}"{where} ORDER BY rowid LIMIT 1 OFFSET ?',
+                           params + (shard_rows,)).fetchone()
+        if row is None:
+            break
+        starts.append(row[0])
+    return [(lo, hi) for lo, hi in zip(starts, starts[1:] + [None])] if len(starts) > 1 else [None]
+
+
+def column_counts(conn: sqlite3.Connection, table: str, columns: list, bounds=None) -> list:
+    """
+    Per column: integers, reals or NULLs, texts, blobs and non-numeric texts,
+    counted in one scan of the table (or of one shard).
+    """
+    if not columns:
+        return []
+    checks = []
+    for name in columns:
+        col = f'"{name}"'
+        checks += [
+            f"SUM(typeof({col}) = 'integer')",
+            f"SUM(typeof({col}) IN ('real', 'null'))",
+            f"SUM(typeof({col}) = 'text')",
+            f"SUM(typeof({col}) = 'blob')",
+            f"SUM(typeof({col}) = 'text' AND NOT is_number({col}))",
+        ]
+    where, params = shard_filter(bounds)
+    return [c or 0 for c in conn.execute(f'SELECT {", ".join(checks)} FROM "{table}"{where}', params).fetchone()]
+
+
+def plan_from_counts(table: str, columns: list, counts: list) -> dict:
+    """
+    Decides each column's output type, so every chunk is converted the same way:
+
+    - "int": integers only, no NULLs
+    - "float": numbers (or numeric text such as "1 234") with NULLs or reals
+    - "text": any text that is not numeric
+    - "object": BLOBs, written as they are
+    - "date": the table's DATE_COLUMNS
+    """
+    plan = {}
+    for i, name in enumerate(columns):
+        integers, reals_or_nulls, text, blobs, non_numeric = counts[i * 5:i * 5 + 5]
+        if name in DATE_COLUMNS.get(table, ()):
+            plan[name] = "date"
+        elif blobs:
+            plan[name] = "object"
+        elif non_numeric:
+            plan[name] = "text"
+        elif integers and not (reals_or_nulls or text):
+            plan[name] = "int"
+        else:
+            plan[name] = "float"
+    return plan
+
+
+def column_plan(conn: sqlite3.Connection, table: str) -> dict:
+    columns = table_columns(conn, table)
+    return plan_from_counts(table, columns, column_counts(conn, table, columns))
+
+
+def output_columns(table: str, plan: dict) -> list:
+    return list(plan) + (["ReportQuarter"] if table in QUARTER_SOURCE else [])
+
+
+def read_chunks(conn: sqlite3.Connection, table: str, chunksize: int, bounds=None):
+    where, params = shard_filter(bounds)
+    order = " ORDER BY rowid" if has_rowid(conn, table) else ""
+    return pd.read_sql(f'SELECT * FROM "{table}"{where}{order}', conn, params=params, chunksize=chunksize)
+
+
+def report_quarter(dates: pd.Series) -> pd.Series:
+    """
+    Start of the reporting quarter for each date. Period ends falling in the first
+    four days of a quarter (e.g. 2023-04-01) still belong to the previous one.
+    """
+    valid = dates.notna().to_numpy()
+    year = dates.dt.year.fillna(1970).to_numpy(dtype=np.int64)
+    month = dates.dt.month.fillna(1).to_numpy(dtype=np.int64)
+    day = dates.dt.day.fillna(1).to_numpy(dtype=np.int64)
+
+    quarter = (month - 1) // 3
+    quarter -= (month % 3 == 1) & (month > 1) & (day <= 4)
+    starts = ((year - 1970) * 12 + quarter * 3).astype("datetime64[M]").astype("datetime64[ns]")
+    starts[~valid] = np.datetime64("NaT")
+    return pd.Series(starts, index=dates.index)
+
+
+def convert_chunk(df: pd.DataFrame, plan: dict, table: str) -> pd.DataFrame:
+    for name, kind in plan.items():
+        values = df[name]
+        if kind == "date":
+            df[name] = pd.to_datetime(values, format="%Y-%m-%d", errors="coerce")
+        elif kind == "float":
+            if values.dtype == object:
+                values = values.str.replace(" ", "", regex=False).fillna(values)
+            df[name] = values.astype(float)
+        elif kind == "int":
+            df[name] = values.astype(np.int64)
+
+    if table in QUARTER_SOURCE:
+        df["ReportQuarter"] = report_quarter(df[QUARTER_SOURCE[table]])
+    return df
+
+
+class CSVSink:
+    def __init__(self, path: str, columns: list, header: bool = True):
+        self.path = path
+        self.columns = columns
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.header = header
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(self.file, index=False, header=self.header)
+        self.header = False
+
+    def close(self):
+        if self.header:
+            pd.DataFrame(columns=self.columns).to_csv(self.file, index=False)
+        self.file.close()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet output requires the 'pyarrow' package.") from e
+    return pyarrow
+
+
+class ParquetSink:
+    """
+    Writes each chunk as one Parquet row group.
+    """
+
+    ARROW_TYPES = {"int": "int64", "float": "float64", "text": "string", "object": "binary", "date": "timestamp[ns]"}
+
+    def __init__(self, path: str, columns: list, plan: dict):
+        self.pa = _pyarrow()
+        types = {name: self.ARROW_TYPES[kind] for name, kind in plan.items()}
+        types.setdefault("ReportQuarter", "timestamp[ns]")
+        self.schema = self.pa.schema([(name, self.pa.type_for_alias(types[name])) for name in columns])
+        self.text_columns = [name for name, kind in plan.items() if kind == "text"]
+        self.writer = self.open_writer(path)
+
+    def open_writer(self, path: str):
+        return self.pa.parquet.ParquetWriter(path, self.schema, compression="snappy")
+
+    def table(self, df: pd.DataFrame):
+        for name in self.text_columns:
+            # Non-numeric text columns may still hold a few numbers.
+            df[name] = df[name].map(lambda v: v if v is None or isinstance(v, str) else str(v))
+        return self.pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+
+    def write(self, df: pd.DataFrame):
+        self.writer.write_table(self.table(df))
+
+    def close(self):
+        self.writer.close()
+
+
+class ArrowPartSink(ParquetSink):
+    """
+    Shard output for parallel Parquet exports: converted chunks are kept as Arrow
+    record batches, one per chunk, and become row groups when the parts are joined.
+    """
+
+    def open_writer(self, path: str):
+        self.file = self.pa.OSFile(path, "wb")
+        return self.pa.ipc.new_file(self.file, self.schema)
+
+    def write(self, df: pd.DataFrame):
+        # One batch per chunk, even an empty one: ParquetSink writes a row group for it too.
+        batches = self.table(df).combine_chunks().to_batches()
+        self.writer.write_batch(batches[0] if batches else self.pa.RecordBatch.from_pylist([], schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        self.file.close()
+
+
+def open_sink(path: str, format: str, columns: list, plan: dict):
+    if format == "parquet":
+        return ParquetSink(path, columns, plan)
+    return CSVSink(path, columns)
+
+
+def export_table(conn: sqlite3.Connection, table: str, out_dir: str, format: str = "csv",
+                 chunksize: int = CHUNKSIZE) -> tuple:
+    """
+    Streams one table to <out_dir>/<table>.<format>. Returns (path, rows, seconds).
+    """
+    start = time.perf_counter()
+    plan = column_plan(conn, table)
+    path = os.path.join(out_dir, f"{table}.{format}")
+
+    rows = 0
+    sink = open_sink(path, format, output_columns(table, plan), plan)
+    try:
+        for chunk in read_chunks(conn, table, chunksize):
+            sink.write(convert_chunk(chunk, plan, table))
+            rows += len(chunk)
+    finally:
+        sink.close()
+    return path, rows, time.perf_counter() - start
+
+
+def count_shard(database: str, table: str, columns: list, bounds) -> list:
+    conn = connect(database)
+    try:
+        return column_counts(conn, table, columns, bounds)
+    finally:
+        conn.close()
+
+
+def export_shard(database: str, table: str, plan: dict, bounds, part_path: str, format: str,
+                 chunksize: int, first: bool) -> int:
+    """
+    Converts one shard into a part file: CSV rows (with the header for the first
+    shard) or Arrow record batches. Returns the number of rows.
+    """
+    conn = connect(database)
+    columns = output_columns(table, plan)
+    sink = ArrowPartSink(part_path, columns, plan) if format == "parquet" else CSVSink(part_path, columns, header=first)
+    rows = 0
+    try:
+        for chunk in read_chunks(conn, table, chunksize, bounds):
+            sink.write(convert_chunk(chunk, plan, table))
+            rows += len(chunk)
+    finally:
+        sink.close()
+        conn.close()
+    return rows
+
+
+def join_parts(parts: list, path: str, format: str, plan: dict, table: str):
+    if format == "csv":
+        with open(path, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        return
+
+    pa = _pyarrow()
+    sink = ParquetSink(path, output_columns(table, plan), plan)
+    try:
+        for part in parts:
+            with pa.memory_map(part, "r") as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    sink.writer.write_table(pa.Table.from_batches([reader.get_batch(i)]))
+    finally:
+        sink.close()
+
+
+def export_parallel(database: str, tables: list, out_dir: str, format: str = "csv",
+                    chunksize: int = CHUNKSIZE, workers: int = None, shard_rows: int = SHARD_ROWS):
+    """
+    Exports tables with a process pool, in two passes over rowid-range shards:
+    column counts (merged into one plan per table), then conversion into part
+    files that are joined in shard order. Shards are whole multiples of chunksize,
+    so Parquet row groups match the sequential run too.
+    Yields (table, path, rows, seconds) as tables complete, in order.
+    """
+    shard_rows = max(shard_rows // chunksize, 1) * chunksize
+    conn = connect(database)
+    try:
+        shards = {table: table_shards(conn, table, shard_rows) for table in tables}
+        columns = {table: table_columns(conn, table) for table in tables}
+    finally:
+        conn.close()
+
+    start = time.perf_counter()
+    parts_dir = tempfile.mkdtemp(prefix=".export-", dir=out_dir)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = {table: [pool.submit(count_shard, database, table, columns[table], bounds)
+                              for bounds in shards[table]] for table in tables}
+            plans = {}
+            for table in tables:
+                totals = [sum(values) for values in zip(*(f.result() for f in counts[table]))]
+                plans[table] = plan_from_counts(table, columns[table], totals)
+
+            jobs = {}
+            for table in tables:
+                jobs[table] = []
+                for i, bounds in enumerate(shards[table]):
+                    part = os.path.join(parts_dir, f"{table}.{i:06d}")
+                    future = pool.submit(export_shard, database, table, plans[table], bounds, part,
+                                         format, chunksize, i == 0)
+                    jobs[table].append((part, future))
+
+            for table in tables:
+                rows = sum(future.result() for _, future in jobs[table])
+                path = os.path.join(out_dir, f"{table}.{format}")
+                join_parts([part for part, _ in jobs[table]], path, format, plans[table], table)
+                yield table, path, rows, time.perf_counter() - start
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("database", nargs="?", default="filings_demo_step3.sqlite")
+    parser.add_argument("--out", default=".", help="output directory")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="rows read and written per chunk")
+    parser.add_argument("--tables", nargs="+", help="tables to export (default: all)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; 1 exports sequentially, 0 uses every CPU")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS,
+                        help="rows per shard of a large table in parallel mode")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    conn = connect(args.database)
+    try:
+        tables = args.tables or list_tables(conn)
+        if args.workers == 1:
+            results = (
+                (table,) + export_table(conn, table, args.out, args.format, args.chunksize)
+                for table in tables
+            )
+        else:
+            results = export_parallel(args.database, tables, args.out, args.format, args.chunksize,
+                                      args.workers or os.cpu_count(), args.shard_rows)
+        for table, path, rows, seconds in results:
+            print(f"Table {table}: {rows:,} rows saved to {path} in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
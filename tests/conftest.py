@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.fixture
+def run_python():
+    """
+    Runs code in a fresh interpreter from the repository root, with extra
+    environment variables (settings are read at import), and returns its stdout.
+    """
+    def run(code: str, **env) -> str:
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT, PRELOAD="false", **env),
+            capture_output=True, text=True, timeout=300,
+        )
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+    return run
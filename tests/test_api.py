@@ -0,0 +1,33 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app.app as dashboard
+from app.data_sources import FileSource
+from app.data_store import DataStore
+
+
+@pytest.fixture
+def client():
+    with TestClient(dashboard.api) as client:
+        yield client
+    dashboard.swap_store(DataStore(FileSource(dashboard.DATA_PATH).load_sync()))
+
+
+def test_data_json_encodes_missing_values_as_null(client):
+    frame = FileSource(dashboard.DATA_PATH).load_sync()
+    row = frame.index[frame["Symbol"] == "AAPL"][0]
+    frame.loc[row, ["CCP", "LTD"]] = np.nan
+    quarter = frame.loc[row, "ReportQuarter"]
+    dashboard.swap_store(DataStore(frame))
+
+    params = {"symbol": "AAPL", "from_quarter": quarter, "to_quarter": quarter}
+    response = client.get("/data", params=params)
+    assert response.status_code == 200
+    [record] = response.json()
+    assert record["CCP"] is None and record["LTD"] is None
+
+    [line] = client.get("/data", params={**params, "format": "ndjson"}).text.splitlines()
+    assert json.loads(line)["CCP"] is None
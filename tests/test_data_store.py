@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from app.figures_builder import prepare_data
+from app.data_store import DataStore
+from app.quarter_stats import QuarterStats
+from benchmarks.synthetic import synthetic_records
+
+
+def test_merge_matches_full_rebuild():
+    frame = prepare_data(synthetic_records(20, 8))
+    store = DataStore(frame)
+    store.stats
+
+    rows = synthetic_records(3, 9, seed=1).iloc[[8, 9, 20]].copy()
+    rows["Symbol"] = ["T00004", "T00010", "NEW"]  # new quarter, amended quarter, new company
+    rows["CompanyName"] = ["Company 00004 Inc.", "Company 00010 Inc.", "New Co"]
+    rows.iloc[1, rows.columns.get_loc("CCP")] = np.nan
+    rows = prepare_data(rows)
+    merged, companies, quarters = store.merge(rows)
+
+    combined = pd.concat([frame, rows], ignore_index=True)
+    expected = DataStore(combined.drop_duplicates(["Symbol", "QuarterStart"], keep="last"))
+    pd.testing.assert_frame_equal(merged.frame, expected.frame)
+    assert merged.company_ranges == expected.company_ranges
+    assert merged.quarter_ranges == expected.quarter_ranges
+    assert companies == {"T00004", "T00010", "NEW"} and len(quarters) == 3
+    assert merged.version != store.version
+
+    rebuilt = QuarterStats.from_frame(expected.frame)
+    pd.testing.assert_frame_equal(merged.stats.summary(), rebuilt.summary())
+    pd.testing.assert_frame_equal(merged.stats.company_medians(), rebuilt.company_medians())
+    pd.testing.assert_frame_equal(merged.stats.coverage, rebuilt.coverage)
@@ -0,0 +1,16 @@
+BUILD_FIG_1 = """
+import pandas as pd
+from app.figures_builder import prepare_data, generate_company_colors, create_fig_1
+from app.instrumentation import FIGURE_BUILD_SECONDS
+
+df = prepare_data(pd.read_json("data/financial_data.json"))
+colors = generate_company_colors(df)
+create_fig_1(df, colors)
+create_fig_1(df, colors, metric="LTD", menu=False)
+print(FIGURE_BUILD_SECONDS.render())
+"""
+
+
+def test_building_fig1_counts_in_the_fig1_histogram(run_python):
+    output = run_python(BUILD_FIG_1, METRICS_ENABLED="true")
+    assert 'dashboard_figure_build_seconds_count{figure="fig1"} 2' in output.splitlines()
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from app.mongo_source import load_collection
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.financials
+
+
+def test_numeric_fields_are_coerced(collection):
+    collection.insert_many([
+        {"Symbol": "A", "CompanyName": "A Inc.", "ReportQuarter": "Q1 2024", "CCP": "1,234", "LTD": 10},
+        {"Symbol": "B", "CompanyName": "B Inc.", "ReportQuarter": "Q1 2024", "CCP": "n/a", "LTD": "2.5"},
+    ])
+    frame = load_collection(collection)
+    assert frame["CCP"].dtype == np.float64 and frame["LTD"].dtype == np.float64
+    assert frame["CCP"][0] == 1234 and np.isnan(frame["CCP"][1])
+    assert frame["LTD"].tolist() == [10.0, 2.5]
+
+
+def test_missing_fields_are_empty(collection):
+    collection.insert_one({"Symbol": "A", "CCP": 1})
+    frame = load_collection(collection)
+    assert list(frame.columns) == ["Symbol", "CompanyName", "ReportQuarter", "CCP", "LTD"]
+    assert frame["CompanyName"][0] is None and np.isnan(frame["LTD"][0])
+
+
+def test_buffer_grows_past_initial_capacity(collection):
+    collection.insert_many([{"Symbol": f"S{i}", "CCP": i} for i in range(25)])
+    frame = load_collection(collection, query={"CCP": {"$gte": 0}}, batch_size=2)
+    assert frame["Symbol"].tolist() == [f"S{i}" for i in range(25)]
+    assert frame["CCP"].tolist() == list(range(25))
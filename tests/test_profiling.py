@@ -0,0 +1,29 @@
+import os
+
+RENDER_TAB_REQUEST = """
+from fastapi.testclient import TestClient
+import app.app as a
+
+callback = {
+    "output": "tabs-content.children",
+    "outputs": {"id": "tabs-content", "property": "children"},
+    "inputs": [
+        {"id": "tabs", "property": "value", "value": "tab2"},
+        {"id": "company-filter", "property": "value", "value": None},
+        {"id": "quarter-range", "property": "value", "value": None},
+        {"id": "metric", "property": "value", "value": "both"},
+    ],
+    "changedPropIds": ["tabs.value"],
+}
+with TestClient(a.api) as client:
+    response = client.post("/dashboard/_dash-update-component", json=callback, headers={"X-Profile": "1"})
+    assert response.status_code == 200, response.text
+"""
+
+
+def test_cprofile_profiles_render_tab_as_pstats(run_python, tmp_path):
+    run_python(RENDER_TAB_REQUEST, PROFILING="header", PROFILER="cprofile",
+               PROFILE_DIR=str(tmp_path), PROFILE_THRESHOLD_MS="0")
+    names = os.listdir(tmp_path)
+    assert len(names) == 1
+    assert "render_tab_tab2" in names[0] and names[0].endswith(".pstats")
@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+import app.shared_dataset as shared
+from app.data_sources import get_origin_source
+from app.data_store import DataStore
+from app.figures_builder import prepare_data
+from benchmarks.synthetic import synthetic_records
+
+pytest.importorskip("pyarrow")
+
+
+def test_load_rereads_pointer_when_version_was_removed(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    old = DataStore(prepare_data(synthetic_records(3, 4)))
+    new = DataStore(prepare_data(synthetic_records(4, 4)))
+    stale = shared.publish(old, directory)
+    shared.publish(new, directory)
+    os.remove(os.path.join(directory, stale["file"]))  # as after two more publishes
+
+    pointers = iter([stale])
+    read_pointer = shared.read_pointer
+    monkeypatch.setattr(shared, "read_pointer", lambda d: next(pointers, None) or read_pointer(d))
+    source = shared.SharedSource(directory, get_origin_source())
+    frame = source.load_sync()
+    assert source.version == new.version and len(frame) == len(new)
+
+
+def test_publish_command_does_not_load_the_app(tmp_path, run_python):
+    out = run_python(
+        "import sys; import app.shared_dataset as s; "
+        f"sys.argv = ['publish', 'publish', '--dir', {str(tmp_path)!r}]; s.main(); "
+        "print('app.app' in sys.modules, 'dash' in sys.modules)"
+    )
+    assert out.splitlines()[-1] == "False False"
+    assert shared.read_pointer(str(tmp_path)) is not None